@@ -2,51 +2,97 @@
 # Application factory and package setup.
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from config import Config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Encodes JSON responses with orjson, falling back to Flask's encoder for custom options.
+    Output matches Flask's: keys are sorted when sort_keys is set, and dates are handed to
+    Flask's default hook so they stay HTTP dates rather than orjson's ISO strings.
+    """
+    @property
+    def options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str.
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 def create_app(config_class=Config):
     """Creates and configures the Flask application."""
     # Explicitly define the template folder relative to the app's instance path.
     app = Flask(__name__, instance_relative_config=True, template_folder='templates')
     app.config.from_object(config_class)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
 
     # --- Logging Setup ---
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+    os.makedirs('logs', exist_ok=True)
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_file = os.path.join('logs', f'app_run_{timestamp}.log')
+    # One file per process: pre-forked workers each get their own instead of racing on timestamps.
+    log_file = os.path.join('logs', f'app_run_{os.getpid()}.log')
     
     file_handler = RotatingFileHandler(log_file, maxBytes=10240, backupCount=10)
     file_handler.setFormatter(logging.Formatter(
         '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
     ))
     file_handler.setLevel(logging.INFO)
+
+    # Hand records to a background thread so request threads never block on disk writes.
+    log_queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
     
-    app.logger.addHandler(file_handler)
+    app.logger.addHandler(QueueHandler(log_queue))
     app.logger.setLevel(logging.INFO)
     app.logger.info('GitLab Analytics Hub startup')
 
     # --- Enhanced Debug Logging for Template Pathing ---
-    app.logger.info(f"--- PATH DEBUGGING ---")
-    app.logger.info(f"App Root Path: {app.root_path}")
-    app.logger.info(f"App Template Folder: {app.template_folder}")
-    app.logger.info(f"Full Template Path: {os.path.join(app.root_path, app.template_folder)}")
-    app.logger.info(f"--- END PATH DEBUGGING ---")
+    verbose_startup = app.debug or app.config.get('VERBOSE_STARTUP')
+    if verbose_startup:
+        app.logger.info(f"--- PATH DEBUGGING ---")
+        app.logger.info(f"App Root Path: {app.root_path}")
+        app.logger.info(f"App Template Folder: {app.template_folder}")
+        app.logger.info(f"Full Template Path: {os.path.join(app.root_path, app.template_folder)}")
+        app.logger.info(f"--- END PATH DEBUGGING ---")
 
     # --- Register Blueprints ---
     from app.main import bp as main_bp
     app.register_blueprint(main_bp)
 
     # --- Log Registered Blueprints for Debugging ---
-    app.logger.info("--- BLUEPRINT DEBUGGING ---")
-    for bp_name, blueprint in app.blueprints.items():
-        app.logger.info(f"Registered Blueprint: '{bp_name}'")
-        app.logger.info(f"  - Blueprint Template Folder: {blueprint.template_folder}")
-    app.logger.info("--- END BLUEPRINT DEBUGGING ---")
+    if verbose_startup:
+        app.logger.info("--- BLUEPRINT DEBUGGING ---")
+        for bp_name, blueprint in app.blueprints.items():
+            app.logger.info(f"Registered Blueprint: '{bp_name}'")
+            app.logger.info(f"  - Blueprint Template Folder: {blueprint.template_folder}")
+        app.logger.info("--- END BLUEPRINT DEBUGGING ---")
 
     return app
@@ -0,0 +1,128 @@
+# /app/main/file_store.py
+# A small key/value store on disk, so every worker process sees the same entries.
+
+import os
+import sys
+import time
+import json
+import base64
+import shutil
+import hashlib
+import tempfile
+
+from flask import current_app
+
+def _encode(value):
+    """JSON hook for the few non-JSON values the stores hold: bytes and DataFrames."""
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return {'__dataframe__': value.to_dict(orient='split')}
+    raise TypeError(f"Object of type {type(value).__name__} cannot be stored")
+
+def _decode(obj):
+    if '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    if '__dataframe__' in obj:
+        import pandas as pd
+        return pd.DataFrame(**obj['__dataframe__'])
+    return obj
+
+def _ensure_private_directory(path):
+    """Creates path if needed and refuses to use it unless only this user can access it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"Shared state directory {path} must be owned by this user with mode 0700.")
+
+class FileStore:
+    """
+    Stores JSON-encoded values as files under the app's SHARED_STATE_DIR, which defaults to
+    the instance folder. Tuple keys are grouped by their first element so a whole group can
+    be deleted at once. Entries expire `ttl` seconds after they were last written; expired
+    files are swept every few hundred writes.
+    """
+    PRUNE_EVERY = 200
+
+    def __init__(self, name, ttl=300):
+        self.name = name
+        self.ttl = ttl
+        self._writes = 0
+
+    def _directory(self):
+        root = current_app.config.get('SHARED_STATE_DIR') or os.path.join(current_app.instance_path, 'shared_state')
+        _ensure_private_directory(root)
+        directory = os.path.join(root, self.name)
+        _ensure_private_directory(directory)
+        return directory
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+    def _group_directory(self, group):
+        return os.path.join(self._directory(), self._digest(group))
+
+    def _path(self, key):
+        if isinstance(key, tuple):
+            return os.path.join(self._group_directory(key[0]), self._digest(key[1:]))
+        return os.path.join(self._directory(), self._digest(key))
+
+    def get(self, key, default=None):
+        """Returns the stored value for key, or default if it is missing or expired."""
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return default
+            with open(path, 'rb') as f:
+                return json.load(f, object_hook=_decode)
+        except (FileNotFoundError, ValueError):
+            return default
+
+    def set(self, key, value):
+        """Stores value under key, replacing the file atomically so readers never see a partial write."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f, default=_encode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune(self._directory())
+
+    def delete(self, key):
+        """Removes key if it is stored."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_group(self, group):
+        """Removes every entry whose tuple key starts with group."""
+        shutil.rmtree(self._group_directory(group), ignore_errors=True)
+
+    def _prune(self, directory):
+        """Deletes every expired entry, including temp files left by interrupted writes."""
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Groups idle for a whole TTL are removed once their entries are gone.
+                    if entry.stat().st_mtime < cutoff and not os.listdir(entry.path):
+                        os.rmdir(entry.path)
+                    else:
+                        self._prune(entry.path)
+                elif entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,43 @@
+# /app/main/jobs.py
+# Runs long report builds off the request thread and tracks their progress.
+# A job is built by the worker process that queued it, but its state and result are kept
+# in a FileStore, so status polls and downloads can be answered by any worker.
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.main.file_store import FileStore
+
+# A few workers are enough: each report build already fans out its own GitLab requests.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='report-job')
+
+# Finished jobs keep their result for an hour so the browser can fetch it.
+_jobs = FileStore('report_jobs', ttl=3600)
+
+def submit_job(owner, func, *args, **kwargs):
+    """Queues func on the background pool and returns the new job's ID."""
+    app = current_app._get_current_object()
+    job_id = uuid.uuid4().hex
+    job = {'owner': list(owner), 'state': 'queued', 'result': None, 'error': None}
+    _jobs.set(job_id, job)
+
+    def run():
+        with app.app_context():
+            _jobs.set(job_id, dict(job, state='started'))
+            try:
+                _jobs.set(job_id, dict(job, state='finished', result=func(*args, **kwargs)))
+            except Exception as e:
+                app.logger.error(f"Background job {job_id} failed: {e}")
+                _jobs.set(job_id, dict(job, state='failed', error=str(e)))
+
+    _executor.submit(run)
+    return job_id
+
+def get_job(job_id, owner):
+    """Returns the job with this ID if it belongs to owner, otherwise None."""
+    job = _jobs.get(job_id)
+    if job is None or job['owner'] != list(owner):
+        return None
+    return job
@@ -1,77 +1,145 @@
 # /app/main/logic.py
 # Contains business logic for reports and automations.
 
+import re
+import time
+import functools
 from datetime import datetime, timedelta, timezone
-import pandas as pd
 from flask import current_app, render_template
-from dateutil.relativedelta import relativedelta
+from app.main.services import TTLCache, run_concurrently
+
+@functools.lru_cache(maxsize=1)
+def _last_week_iso(minute_bucket):
+    return (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+
+def last_week_iso():
+    """Returns the ISO timestamp of one week ago, computed once per minute and shared by all requests."""
+    return _last_week_iso(int(time.time() // 60))
+
+# Keyword tables for scoped label suggestions. Within a scope, earlier entries
+# take precedence over later ones regardless of where they appear in the text.
+_SCOPE_KEYWORDS = (
+    ('type', "type::bug", ("bug", "error", "fix", "issue", "problem", "failure")),
+    ('type', "type::new-feature", ("feature", "implement", "add new", "create")),
+    ('type', "type::enhancement", ("enhance", "improve", "update", "refine")),
+    ('workflow', "workflow::blocked", ("blocked", "waiting for")),
+    ('workflow', "workflow::review", ("review",)),
+    ('workflow', "workflow::qa", ("qa", "test")),
+    ('priority', "priority::1", ("critical", "urgent", "blocker", "asap")),
+    ('priority', "priority::3", ("low priority", "cosmetic")),
+)
+_SCOPE_DEFAULTS = {
+    'type': "type::categorisation",
+    'workflow': "workflow::triage",
+    'priority': "priority::2",
+}
+
+def _build_keyword_matcher(scope_keywords):
+    """Compiles every scope keyword into one pattern that is scanned in a single pass."""
+    keyword_labels = {}
+    scope_ranks = {}
+    for scope, label, keywords in scope_keywords:
+        rank = scope_ranks.get(scope, 0)
+        scope_ranks[scope] = rank + 1
+        for kw in keywords:
+            keyword_labels[kw] = (scope, rank, label)
+    # A lookahead lets matches overlap; word boundaries stop "test" matching inside "latest".
+    # Content is casefolded before scanning, so the pattern itself is case-sensitive.
+    alternation = '|'.join(re.escape(kw) for kw in sorted(keyword_labels, key=len, reverse=True))
+    return re.compile(rf"(?=\b({alternation})\b)"), keyword_labels
+
+_KEYWORD_RE, _KEYWORD_LABELS = _build_keyword_matcher(_SCOPE_KEYWORDS)
+
+# Sections mentioning any of these are treated as requirements when extracting stories.
+_PRD_KEYWORDS_RE = re.compile(r'\b(?:features?|requirements?|user should|system should|must|shall)\b', re.IGNORECASE)
+
+def _scope_map(labels):
+    """Indexes scoped labels ('scope::value') by scope, keeping the first value seen per scope."""
+    scopes = {}
+    for label in labels:
+        scope, sep, value = label.partition('::')
+        if sep and scope:
+            scopes.setdefault(scope, value)
+    return scopes
+
+# Templated and bot-filed issues often share identical content, so classifications are cached.
+# Callers pass casefolded content, so issues differing only in case share an entry.
+@functools.lru_cache(maxsize=4096)
+def _classify_content(content, missing_scopes):
+    """Suggests a label for each missing scope from the issue's title and description."""
+    best_matches = {}
+    for match in _KEYWORD_RE.finditer(content):
+        scope, rank, label = _KEYWORD_LABELS[match.group(1)]
+        if scope not in missing_scopes:
+            continue
+        if scope not in best_matches or rank < best_matches[scope][0]:
+            best_matches[scope] = (rank, label)
+            if len(best_matches) == len(missing_scopes) and all(r == 0 for r, _ in best_matches.values()):
+                break
+
+    scoped_suggestions = {}
+    for scope in missing_scopes:
+        scoped_suggestions[scope] = best_matches[scope][1] if scope in best_matches else _SCOPE_DEFAULTS[scope]
+    return scoped_suggestions
+
+def _label_set(labels_str):
+    """Parses a comma-separated label list from a report form."""
+    return frozenset(label.strip() for label in labels_str.split(',') if label.strip())
+
+# Issue attributes read by the analytics report; weight is absent on GitLab CE.
+_ANALYTICS_FIELDS = (
+    'iid', 'title', 'state', 'web_url', 'project_id', 'created_at', 'updated_at', 'closed_at',
+    'due_date', 'labels', 'milestone', 'assignee', 'assignees', 'author', 'time_stats', 'weight'
+)
+
+# Escape metrics per (connection, scope, period, labels); trend reports re-query the same months.
+_escape_metrics_cache = TTLCache(maxsize=512, ttl=300)
 
 class AutomationLogic:
     """Contains logic for automations."""
     @staticmethod
     def suggest_labels_scoped(issue, existing_labels):
         """Analyzes an issue to suggest a label for each missing scope."""
-        scoped_suggestions = {}
-        content = f"{issue.title.lower()} {issue.description.lower() if issue.description else ''}"
-
-        has_type = any(l.startswith('type::') for l in existing_labels)
-        has_workflow = any(l.startswith('workflow::') for l in existing_labels)
-        has_priority = any(l.startswith('priority::') for l in existing_labels)
-
-        if not has_type:
-            if any(kw in content for kw in ["bug", "error", "fix", "issue", "problem", "failure"]):
-                scoped_suggestions['type'] = "type::bug"
-            elif any(kw in content for kw in ["feature", "implement", "add new", "create"]):
-                scoped_suggestions['type'] = "type::new-feature"
-            elif any(kw in content for kw in ["enhance", "improve", "update", "refine"]):
-                scoped_suggestions['type'] = "type::enhancement"
-            else:
-                scoped_suggestions['type'] = "type::categorisation"
-
-        if not has_workflow:
-            if "blocked" in content or "waiting for" in content:
-                scoped_suggestions['workflow'] = "workflow::blocked"
-            elif "review" in content:
-                scoped_suggestions['workflow'] = "workflow::review"
-            elif "qa" in content or "test" in content:
-                scoped_suggestions['workflow'] = "workflow::qa"
-            else:
-                scoped_suggestions['workflow'] = "workflow::triage"
-
-        if not has_priority:
-            if any(kw in content for kw in ["critical", "urgent", "blocker", "asap"]):
-                scoped_suggestions['priority'] = "priority::1"
-            elif any(kw in content for kw in ["low priority", "cosmetic"]):
-                scoped_suggestions['priority'] = "priority::3"
-            else:
-                scoped_suggestions['priority'] = "priority::2"
-
-        return scoped_suggestions
+        has_type = has_workflow = has_priority = False
+        for l in existing_labels:
+            if l[:6] == 'type::':
+                has_type = True
+            elif l[:10] == 'workflow::':
+                has_workflow = True
+            elif l[:10] == 'priority::':
+                has_priority = True
+            if has_type and has_workflow and has_priority:
+                return {}
+        missing_scopes = tuple(scope for scope, present in
+                               (('type', has_type), ('workflow', has_workflow), ('priority', has_priority))
+                               if not present)
+
+        content = f"{issue.title} {issue.description or ''}".casefold()
+        return dict(_classify_content(content, missing_scopes))
     
     @staticmethod
     def generate_stories_from_prd(prd_content):
         """Extracts user stories from PRD content based on simple rules."""
         user_stories = []
-        sections = prd_content.split('\n\n')
+        sections = [section.strip() for section in prd_content.split('\n\n')]
         story_counter = 1
         for section in sections:
-            if section.strip():
-                if any(keyword in section.lower() for keyword in ['feature', 'requirement', 'user should', 'system should', 'must', 'shall']):
-                    lines = section.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            story_description = f"As a user, I want to {line.lower()}" if not line.lower().startswith('as a') else line
-                            user_stories.append({
-                                'id': f"story_{story_counter}",
-                                'title': f"User Story: {line[:50]}...",
-                                'description': story_description
-                            })
-                            story_counter += 1
+            if section and _PRD_KEYWORDS_RE.search(section):
+                for line in section.split('\n'):
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        lowered = line.lower()
+                        story_description = line if lowered.startswith('as a') else f"As a user, I want to {lowered}"
+                        user_stories.append({
+                            'id': f"story_{story_counter}",
+                            'title': f"User Story: {line[:50]}...",
+                            'description': story_description
+                        })
+                        story_counter += 1
         
         if not user_stories:
-            paragraphs = [p.strip() for p in prd_content.split('\n\n') if p.strip() and not p.strip().startswith('#')]
-            for i, paragraph in enumerate(paragraphs[:10], 1):
+            paragraphs = [s for s in sections if s and not s.startswith('#')][:10]
+            for i, paragraph in enumerate(paragraphs, 1):
                 user_stories.append({
                     'id': f"story_{i}",
                     'title': f"User Story {i}",
@@ -83,56 +151,81 @@ class AutomationLogic:
 class ReportGenerator:
     """Contains logic to generate reports."""
     @staticmethod
-    def _convert_seconds_to_man_days(seconds):
-        if not isinstance(seconds, (int, float)) or seconds == 0: return 0.0
-        return round(seconds / (8 * 3600), 2)
+    def _count_closed(issues):
+        """Counts closed issues with a single NumPy comparison over their states."""
+        import numpy as np
+        states = np.fromiter((i.state for i in issues), dtype='U8', count=len(issues))
+        return int((states == 'closed').sum())
 
     @staticmethod
-    def _fetch_issues_with_or_labels(gl_service, labels_str, base_params):
-        """Helper to fetch issues with an OR condition on labels."""
-        all_issues = {}
-        labels = [label.strip() for label in labels_str.split(',') if label.strip()]
-        for label in labels:
-            params = base_params.copy()
-            params['labels'] = label
-            issues = gl_service.get_all_issues(**params)
-            for issue in issues:
-                all_issues[issue.id] = issue
-        return list(all_issues.values())
+    def _convert_seconds_series_to_man_days(seconds):
+        """Converts a Series of second counts to man days, treating missing values as zero."""
+        import numpy as np
+        import pandas as pd
+        seconds = pd.to_numeric(seconds, errors='coerce').fillna(0)
+        return np.round(seconds / 28800.0, 2)  # 8-hour man day
+
+    @staticmethod
+    def _convert_seconds_list_to_man_days(seconds):
+        """Converts a list of second counts to man days in one NumPy pass, without building a Series."""
+        import numpy as np
+        seconds = np.fromiter((s or 0 for s in seconds), dtype=float, count=len(seconds))
+        return np.round(seconds / 28800.0, 2).tolist()  # 8-hour man day
+
+    @staticmethod
+    def _first_scoped_label(labels, prefix, default):
+        """For a Series of label lists, returns the value of the first label starting with `prefix`."""
+        exploded = labels.explode().dropna().astype(str)
+        values = exploded[exploded.str.startswith(prefix)].str.split('::').str[1]
+        return values.groupby(level=0).first().reindex(labels.index, fill_value=default)
 
     @staticmethod
     def _calculate_escape_metrics(gl_service, scope_id, scope_type, start_date, end_date, qa_labels, prod_labels):
         """Centralized logic for calculating defect and dev escape rates."""
-        created_params = {
-            'scope_id': scope_id,
-            'scope_type': scope_type,
-            'created_after': start_date,
-            'created_before': end_date
-        }
-        
-        qa_issues = ReportGenerator._fetch_issues_with_or_labels(gl_service, qa_labels, created_params)
-        prod_issues = ReportGenerator._fetch_issues_with_or_labels(gl_service, prod_labels, created_params)
-        total_issues_created = gl_service.get_all_issues(**created_params)
+        cache_key = (gl_service.cache_key, scope_id, scope_type, start_date, end_date, qa_labels, prod_labels)
+        cached_metrics = _escape_metrics_cache.get(cache_key)
+        if cached_metrics is not None:
+            return cached_metrics
+
+        qa_set, prod_set = _label_set(qa_labels), _label_set(prod_labels)
+        scope = gl_service.get_scope_object(scope_id, scope_type)
+        counts = scope and gl_service.get_escape_issue_counts(
+            scope.full_path, scope_type, sorted(qa_set), sorted(prod_set), start_date, end_date
+        )
+        if not counts:
+            # Without the GraphQL OR filter, one REST fetch is partitioned locally; the
+            # REST issues endpoint only ANDs labels, so it cannot do the OR itself.
+            issues = gl_service.get_all_issues(
+                scope_id=scope_id, scope_type=scope_type, created_after=start_date, created_before=end_date
+            )
+            counts = {
+                'total': len(issues),
+                'qa': sum(1 for issue in issues if not qa_set.isdisjoint(issue.labels)),
+                'prod': sum(1 for issue in issues if not prod_set.isdisjoint(issue.labels))
+            }
 
-        total_qa_bugs = len(qa_issues)
-        total_prod_bugs = len(prod_issues)
-        total_tickets = len(total_issues_created) - total_qa_bugs
+        total_qa_bugs = counts['qa']
+        total_prod_bugs = counts['prod']
+        total_tickets = counts['total'] - total_qa_bugs
 
         qa_escape_ratio = (total_prod_bugs / total_qa_bugs) * 100 if total_qa_bugs > 0 else 0
         dev_escape_rate = (total_qa_bugs / total_tickets) * 100 if total_tickets > 0 else 0
 
-        return {
+        metrics = {
             "total_qa_bugs": total_qa_bugs,
             "total_prod_bugs": total_prod_bugs,
             "total_tickets": total_tickets,
             "qa_escape_ratio": qa_escape_ratio,
             "dev_escape_rate": dev_escape_rate
         }
+        _escape_metrics_cache.set(cache_key, metrics)
+        return metrics
 
     @staticmethod
     def generate_defect_escape_report(gl_service, scope_id, scope_type, start_date, end_date, qa_labels, prod_labels):
         """Generates the Defect Escape Ratio report with OR logic for labels."""
-        current_app.logger.info(f"Generating Defect Escape Report for {scope_type} {scope_id}")
+        import pandas as pd
+        current_app.logger.debug("Generating Defect Escape Report for %s %s", scope_type, scope_id)
         
         metrics = ReportGenerator._calculate_escape_metrics(
             gl_service, scope_id, scope_type, start_date, end_date, qa_labels, prod_labels
@@ -157,58 +250,64 @@ class ReportGenerator:
             ]
         }
         report_df = pd.DataFrame(summary_data)
-        current_app.logger.info("Defect Escape Report generated successfully.")
+        current_app.logger.debug("Defect Escape Report generated successfully.")
         return report_df, None
 
     @staticmethod
     def generate_defect_trend_report(gl_service, scope_id, scope_type, months, qa_labels, prod_labels):
         """Generates data for the defect escape trend graph."""
-        current_app.logger.info(f"Generating Defect Trend Report for {months} months.")
-        
-        labels = []
-        defect_escape_ratios = []
-        dev_escape_rates = []
-        total_qa_bugs_list = []
-        total_prod_bugs_list = []
-        total_tickets_list = []
+        import pandas as pd
+        current_app.logger.debug("Generating Defect Trend Report for %s months.", months)
+        from dateutil.relativedelta import relativedelta
         
         today = datetime.now(timezone.utc)
         current_month_start = today.replace(day=1)
 
-        for i in range(int(months), 0, -1):
-            end_of_month = current_month_start - relativedelta(months=i-1)
-            start_of_month = current_month_start - relativedelta(months=i)
-            
-            month_label = start_of_month.strftime("%Y-%m")
-            labels.append(month_label)
-
-            metrics = ReportGenerator._calculate_escape_metrics(
-                gl_service, scope_id, scope_type, 
-                start_of_month.strftime('%Y-%m-%d'), 
-                end_of_month.strftime('%Y-%m-%d'), 
-                qa_labels, prod_labels
-            )
-            
-            defect_escape_ratios.append(round(metrics['qa_escape_ratio'], 2))
-            dev_escape_rates.append(round(metrics['dev_escape_rate'], 2))
-            total_qa_bugs_list.append(metrics['total_qa_bugs'])
-            total_prod_bugs_list.append(metrics['total_prod_bugs'])
-            total_tickets_list.append(metrics['total_tickets'])
+        month_starts = [current_month_start - relativedelta(months=k) for k in range(int(months), 0, -1)]
+        labels = [month_start.strftime("%Y-%m") for month_start in month_starts]
+
+        # One fetch covers the whole period; issues are then bucketed by creation month locally.
+        issues = gl_service.get_all_issues(
+            scope_id=scope_id,
+            scope_type=scope_type,
+            created_after=month_starts[0].strftime('%Y-%m-%d'),
+            created_before=current_month_start.strftime('%Y-%m-%d')
+        )
+        qa_set, prod_set = _label_set(qa_labels), _label_set(prod_labels)
+
+        df = pd.DataFrame({
+            'created_at': [issue.created_at for issue in issues],
+            'labels': [issue.labels for issue in issues]
+        })
+        exploded_labels = df['labels'].explode()
+        df['is_qa'] = exploded_labels.isin(qa_set).groupby(level=0).any()
+        df['is_prod'] = exploded_labels.isin(prod_set).groupby(level=0).any()
+        df['month'] = pd.to_datetime(df['created_at'], utc=True, format='ISO8601').dt.strftime('%Y-%m')
+
+        counts = df.groupby('month').agg(
+            qa=('is_qa', 'sum'), prod=('is_prod', 'sum'), total=('is_qa', 'size')
+        ).reindex(labels, fill_value=0).astype(int)
+        tickets = counts['total'] - counts['qa']
+
+        defect_escape_ratios = (counts['prod'] / counts['qa'].where(counts['qa'] > 0) * 100).fillna(0).round(2)
+        dev_escape_rates = (counts['qa'] / tickets.where(tickets > 0) * 100).fillna(0).round(2)
 
         chart_data = {
             'labels': labels,
-            'defect_escape_ratios': defect_escape_ratios,
-            'dev_escape_rates': dev_escape_rates,
-            'total_qa_bugs': total_qa_bugs_list,
-            'total_prod_bugs': total_prod_bugs_list,
-            'total_tickets': total_tickets_list
+            'defect_escape_ratios': defect_escape_ratios.tolist(),
+            'dev_escape_rates': dev_escape_rates.tolist(),
+            'total_qa_bugs': counts['qa'].tolist(),
+            'total_prod_bugs': counts['prod'].tolist(),
+            'total_tickets': tickets.tolist()
         }
         return chart_data, None
 
     @staticmethod
     def generate_issue_tat_trend_report(gl_service, scope_id, scope_type, months):
         """Generates data for the issue TAT trend graph."""
-        current_app.logger.info(f"Generating Issue TAT Trend Report for {months} months.")
+        import pandas as pd
+        current_app.logger.debug("Generating Issue TAT Trend Report for %s months.", months)
+        from dateutil.relativedelta import relativedelta
         
         today = datetime.now(timezone.utc)
         start_date = today - relativedelta(months=int(months))
@@ -225,18 +324,15 @@ class ReportGenerator:
         if not issues:
             return {}, "No closed issues found in the selected period."
 
-        issue_data = []
-        for issue in issues:
-            if issue.created_at and issue.closed_at:
-                created = pd.to_datetime(issue.created_at)
-                closed = pd.to_datetime(issue.closed_at)
-                tat = (closed - created).total_seconds() / (3600 * 24) # TAT in days
-                issue_data.append({'created_at': created, 'tat': tat})
-        
-        if not issue_data:
+        dated_issues = [issue for issue in issues if issue.created_at and issue.closed_at]
+        if not dated_issues:
             return {}, "No issues with valid created/closed dates found."
 
-        df = pd.DataFrame(issue_data)
+        df = pd.DataFrame({
+            'created_at': [issue.created_at for issue in dated_issues],
+            'closed_at': [issue.closed_at for issue in dated_issues]
+        }).apply(pd.to_datetime, format='ISO8601', utc=True)
+        df['tat'] = (df['closed_at'] - df['created_at']).dt.total_seconds() / (3600 * 24) # TAT in days
         df.set_index('created_at', inplace=True)
         
         weekly_avg_tat = df.resample('W-Mon')['tat'].mean()
@@ -255,7 +351,10 @@ class ReportGenerator:
     @staticmethod
     def generate_time_in_status_report(gl_service, scope_id, scope_type, months, stage_labels):
         """Generates data for the Time in Status trend graph."""
-        current_app.logger.info(f"Generating Time in Status Report for {months} months.")
+        import numpy as np
+        import pandas as pd
+        current_app.logger.debug("Generating Time in Status Report for %s months.", months)
+        from dateutil.relativedelta import relativedelta
         
         today = datetime.now(timezone.utc)
         start_date = today - relativedelta(months=int(months))
@@ -269,69 +368,55 @@ class ReportGenerator:
         if not issues:
             return {}, None, "No issues found in the selected period."
 
-        label_to_stage_map = {}
-        all_workflow_labels = set()
-        for stage, labels_str in stage_labels.items():
-            if labels_str:
-                for label in labels_str.split(','):
-                    stripped_label = label.strip()
-                    label_to_stage_map[stripped_label] = stage
-                    all_workflow_labels.add(stripped_label)
-        
-        issues_to_process = [
-            issue for issue in issues 
-            if any(label in all_workflow_labels for label in issue.labels)
-        ]
+        label_to_stage_map = {
+            label.strip(): stage
+            for stage, labels_str in stage_labels.items() if labels_str
+            for label in labels_str.split(',')
+        }
+        all_workflow_labels = frozenset(label_to_stage_map)
+
+        issues_to_process = [issue for issue in issues if not all_workflow_labels.isdisjoint(issue.labels)]
 
         if not issues_to_process:
             return {}, None, "No issues with the specified workflow labels found in the selected period."
 
-        time_entries = []
-        issue_details_for_excel = {}
-
-        for issue in issues_to_process:
-            events = gl_service.get_issue_label_events(issue.project_id, issue.iid)
-            events.sort(key=lambda e: e.created_at)
-            
-            active_labels = {}
-            issue_stage_durations = {stage: 0 for stage, labels in stage_labels.items() if labels}
-
-            for event in events:
-                if not event.label:
-                    continue
-                label_name = event.label['name']
-                stage = label_to_stage_map.get(label_name)
-                
-                if not stage:
-                    continue
-
-                event_time = pd.to_datetime(event.created_at)
-                
-                if event.action == 'add':
-                    active_labels[label_name] = event_time
-                elif event.action == 'remove' and label_name in active_labels:
-                    start_time = active_labels.pop(label_name)
-                    duration_seconds = (event_time - start_time).total_seconds()
-                    time_entries.append({'date': event_time, 'stage': stage, 'duration': duration_seconds})
-                    issue_stage_durations[stage] += duration_seconds
-            
-            issue_details_for_excel[issue.iid] = {
-                'created_date': pd.to_datetime(issue.created_at),
-                'durations': {stage: ReportGenerator._convert_seconds_to_man_days(dur) for stage, dur in issue_stage_durations.items()}
-            }
-
-        if not time_entries:
+        event_records = []
+        for position, issue in enumerate(issues_to_process):
+            for event in gl_service.get_issue_label_events(issue.project_id, issue.iid):
+                if event.label and event.label['name'] in label_to_stage_map:
+                    event_records.append((position, event.label['name'], event.action, event.created_at))
+
+        events_df = pd.DataFrame(event_records, columns=['issue', 'label', 'action', 'date'])
+        events_df['date'] = pd.to_datetime(events_df['date'], utc=True, format='ISO8601')
+        events_df = events_df.sort_values(['issue', 'date'], kind='stable')
+
+        # Each remove closes the span opened by the latest preceding add of the same label.
+        is_remove = events_df['action'].eq('remove')
+        label_keys = [events_df['issue'], events_df['label']]
+        span_id = is_remove.groupby(label_keys).cumsum() - is_remove
+        span_start = events_df['date'].where(events_df['action'].eq('add')).groupby(label_keys + [span_id]).ffill()
+
+        closed = is_remove & span_start.notna()
+        time_entries = pd.DataFrame({
+            'issue': events_df.loc[closed, 'issue'],
+            'date': events_df.loc[closed, 'date'],
+            'stage': events_df.loc[closed, 'label'].map(label_to_stage_map),
+            'duration': (events_df.loc[closed, 'date'] - span_start[closed]).dt.total_seconds()
+        })
+
+        if time_entries.empty:
             return {}, None, "No workflow label activity found for the issues in this period."
 
-        df_graph = pd.DataFrame(time_entries)
-        df_graph['duration_days'] = df_graph['duration'] / (3600 * 8)
-        
-        weekly_df = df_graph.pivot_table(
-            index=pd.Grouper(key='date', freq='W-Mon'), 
-            columns='stage', 
-            values='duration_days', 
-            aggfunc='sum'
-        ).fillna(0)
+        active_stages = [stage for stage, labels in stage_labels.items() if labels]
+        stage_seconds = time_entries.groupby(['issue', 'stage'])['duration'].sum().unstack(fill_value=0).reindex(
+            index=range(len(issues_to_process)), columns=active_stages, fill_value=0
+        )
+
+        weekly_df = (
+            time_entries.groupby([pd.Grouper(key='date', freq='W-Mon'), 'stage'])['duration'].sum()
+            .div(3600 * 8)
+            .unstack('stage', fill_value=0)
+        )
 
         chart_data = {
             'labels': weekly_df.index.strftime('%Y-W%U').tolist(),
@@ -343,18 +428,18 @@ class ReportGenerator:
                 'data': weekly_df[stage].round(2).tolist()
             })
         
-        excel_rows = []
-        excel_epoch = datetime(1899, 12, 30, tzinfo=timezone.utc)
-        for iid, data in issue_details_for_excel.items():
-            row = {'issue iid': iid}
-            delta = data['created_date'] - excel_epoch
-            row['Created Date'] = delta.total_seconds() / (24 * 3600)
-            
-            for stage, duration in data['durations'].items():
-                row[f'time (in days) in workflow stage-{stage}'] = duration
-            excel_rows.append(row)
-            
-        report_df = pd.DataFrame(excel_rows)
+        # IIDs can repeat across projects; as before, each IID keeps its first row and its last issue's values.
+        row_positions = {issue.iid: position for position, issue in enumerate(issues_to_process)}
+        positions = list(row_positions.values())
+
+        # Excel stores dates as fractional days since its 1899-12-30 epoch.
+        created_dates = pd.to_datetime([issue.created_at for issue in issues_to_process], format='ISO8601', utc=True)
+        created_serials = (created_dates - pd.Timestamp('1899-12-30', tz='UTC')).total_seconds() / (24 * 3600)
+        stage_days = np.round(stage_seconds.to_numpy(dtype=float)[positions] / 28800.0, 2)  # 8-hour man day
+
+        report_df = pd.DataFrame(stage_days, columns=[f'time (in days) in workflow stage-{stage}' for stage in active_stages])
+        report_df.insert(0, 'issue iid', list(row_positions))
+        report_df.insert(1, 'Created Date', created_serials[positions])
 
         return chart_data, report_df, None
 
@@ -364,7 +449,8 @@ class ReportGenerator:
         Generates a detailed, per-issue report for the lag between an issue's
         first milestone assignment and that milestone's due date.
         """
-        current_app.logger.info("Generating Triage to Milestone Lag Report based on milestone due dates.")
+        import pandas as pd
+        current_app.logger.debug("Generating Triage to Milestone Lag Report based on milestone due dates.")
         
         milestones_in_range = gl_service.get_milestones(
             scope_id, scope_type, start_date=start_date, end_date=end_date
@@ -373,13 +459,16 @@ class ReportGenerator:
         final_milestones = list(milestones_in_range)
         
         if include_next_milestones:
-            current_app.logger.info("Including next 3 open milestones.")
-            all_open_milestones = gl_service.get_milestones(scope_id, scope_type, state='active')
-            
-            end_date_dt = pd.to_datetime(end_date, utc=True)
+            current_app.logger.debug("Including next 3 open milestones.")
+            # GitLab only applies its timeframe filter when both bounds are given, so an open-ended
+            # end date limits the fetch to milestones not yet over. The API has no ordering option,
+            # so milestones without a due date are dropped and the three soonest picked here.
+            day_after_end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
             future_milestones = [
-                m for m in all_open_milestones 
-                if m.due_date and pd.to_datetime(m.due_date, utc=True) > end_date_dt
+                m for m in gl_service.get_milestones(
+                    scope_id, scope_type, state='active', start_date=day_after_end, end_date='9999-12-31'
+                )
+                if m.due_date and m.due_date > end_date
             ]
             
             future_milestones.sort(key=lambda m: m.due_date)
@@ -392,17 +481,17 @@ class ReportGenerator:
         if not final_milestones:
             return pd.DataFrame(), "No milestones found for the specified criteria."
 
-        all_issues_unfiltered = []
-        for m in final_milestones:
-            all_issues_unfiltered.extend(gl_service.get_all_issues(
-                scope_id=scope_id, scope_type=scope_type, milestone=m.title
-            ))
+        milestone_issue_lists = run_concurrently(
+            lambda m: gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, milestone=m.title),
+            final_milestones
+        )
+        all_issues_unfiltered = [issue for issues in milestone_issue_lists for issue in issues]
         
         if not all_issues_unfiltered:
             return pd.DataFrame(), "No issues found for the selected milestones."
 
         if filter_labels:
-            required_labels = {label.strip() for label in filter_labels.split(',') if label.strip()}
+            required_labels = frozenset(label.strip() for label in filter_labels.split(',') if label.strip())
             all_issues = [
                 issue for issue in all_issues_unfiltered
                 if not required_labels.isdisjoint(issue.labels)
@@ -413,56 +502,58 @@ class ReportGenerator:
         if not all_issues:
             return pd.DataFrame(), "No issues matched the label filters for the milestones in this period."
 
-        project_cache = {}
-        unique_project_ids = {issue.project_id for issue in all_issues}
-        for pid in unique_project_ids:
-            project = gl_service.get_project(pid)
-            project_cache[pid] = project.name_with_namespace if project else "Unknown Project"
+        project_cache = gl_service.get_project_names(
+            {issue.project_id for issue in all_issues}, default="Unknown Project"
+        )
 
-        detailed_lag_data = []
+        detailed_lag_data = {name: [] for name in (
+            'project_name', 'issue_iid', 'issue_type', 'issue_url',
+            'milestone_due_date', 'milestone_assigned_date', 'lag_days'
+        )}
         milestone_map = {m.id: m for m in final_milestones}
+        milestone_issues = [
+            issue for issue in all_issues
+            if issue.milestone and issue.milestone['id'] in milestone_map
+        ]
 
-        for issue in all_issues:
-            if not issue.milestone or issue.milestone['id'] not in milestone_map:
-                continue
+        issue_keys = list({(issue.project_id, issue.iid) for issue in milestone_issues})
+        events_by_issue = dict(zip(issue_keys, run_concurrently(
+            lambda key: gl_service.get_issue_milestone_events(*key), issue_keys
+        )))
 
+        # Many issues share a milestone, so each due date is parsed once up front.
+        due_dates = {m.id: pd.Timestamp(m.due_date, tz='UTC') for m in final_milestones if m.due_date}
+
+        for issue in milestone_issues:
             milestone = milestone_map[issue.milestone['id']]
-            milestone_due_date = pd.to_datetime(milestone.due_date, utc=True)
+            milestone_due_date = due_dates.get(milestone.id)
+            if milestone_due_date is None:
+                continue
 
-            events = gl_service.get_issue_milestone_events(issue.project_id, issue.iid)
-            add_events = sorted([
+            events = events_by_issue[(issue.project_id, issue.iid)]
+            add_events = [
                 e for e in events 
                 if e.action == 'add' and e.milestone and e.milestone['id'] == milestone.id
-            ], key=lambda e: e.created_at)
+            ]
             
             if not add_events:
                 continue
 
-            first_assignment_event = add_events[0]
+            first_assignment_event = min(add_events, key=lambda e: e.created_at)
             assignment_date = pd.to_datetime(first_assignment_event.created_at, utc=True)
             
             lag = (milestone_due_date - assignment_date).days
             
             if lag >= 0:
-                project_name = project_cache.get(issue.project_id, "Unknown Project")
-                
-                issue_type = "NA"
-                for label in issue.labels:
-                    if label.startswith("type::"):
-                        issue_type = label.split("::", 1)[1]
-                        break
-
-                detailed_lag_data.append({
-                    'project_name': project_name,
-                    'issue_iid': issue.iid,
-                    'issue_type': issue_type,
-                    'issue_url': issue.web_url,
-                    'milestone_due_date': milestone_due_date,
-                    'milestone_assigned_date': assignment_date,
-                    'lag_days': lag
-                })
-
-        if not detailed_lag_data:
+                detailed_lag_data['project_name'].append(project_cache.get(issue.project_id, "Unknown Project"))
+                detailed_lag_data['issue_iid'].append(issue.iid)
+                detailed_lag_data['issue_type'].append(_scope_map(issue.labels).get('type', "NA"))
+                detailed_lag_data['issue_url'].append(issue.web_url)
+                detailed_lag_data['milestone_due_date'].append(milestone_due_date)
+                detailed_lag_data['milestone_assigned_date'].append(assignment_date)
+                detailed_lag_data['lag_days'].append(lag)
+
+        if not detailed_lag_data['issue_iid']:
             return pd.DataFrame(), "No valid issue assignments found for past milestones in this period."
 
         report_df = pd.DataFrame(detailed_lag_data)
@@ -472,93 +563,107 @@ class ReportGenerator:
     @staticmethod
     def generate_epic_report(gl_service, group_id, epic_iid):
         """Generates a report for a specific epic."""
+        import pandas as pd
         issues = gl_service.get_epic_issues(group_id, epic_iid)
         if not issues:
             return pd.DataFrame(), "No issues found for this epic."
 
         sorted_issues = sorted(issues, key=lambda i: i.created_at, reverse=True)
 
-        report_data = []
-        for issue in sorted_issues:
-            assignees = ', '.join([a['name'] for a in issue.assignees]) if issue.assignees else 'Unassigned'
-            status = next((l.split('::')[1] for l in issue.labels if l.startswith('workflow::')), "NA")
-            milestone_date = issue.milestone['due_date'] if issue.milestone and 'due_date' in issue.milestone else 'NA'
-            
-            path_with_namespace = issue.references['full'].split('#')[0]
-            issue_url_display = f"{path_with_namespace}#{issue.iid}"
-
-            report_data.append({
-                'Task': issue.title,
-                'Assignees': assignees,
-                'Status': status,
-                'Created': pd.to_datetime(issue.created_at).strftime('%Y-%m-%d'),
-                'Milestone Date': milestone_date,
-                'issue_url': issue.web_url,
-                'issue_url_display': issue_url_display
-            })
-        
-        df = pd.DataFrame(report_data)
+        df = pd.DataFrame({
+            'Task': [issue.title for issue in sorted_issues],
+            'assignees': [issue.assignees for issue in sorted_issues],
+            'labels': [issue.labels for issue in sorted_issues],
+            'Created': [issue.created_at for issue in sorted_issues],
+            'Milestone Date': [
+                issue.milestone['due_date'] if issue.milestone and 'due_date' in issue.milestone else 'NA'
+                for issue in sorted_issues
+            ],
+            'issue_url': [issue.web_url for issue in sorted_issues],
+            'references_full': [issue.references['full'] for issue in sorted_issues],
+            'iid': [issue.iid for issue in sorted_issues]
+        })
+        assignee_names = df.pop('assignees').explode().dropna().str.get('name')
+        df.insert(1, 'Assignees', assignee_names.groupby(level=0).agg(', '.join).reindex(df.index, fill_value='Unassigned'))
+        df.insert(2, 'Status', ReportGenerator._first_scoped_label(df.pop('labels'), 'workflow::', "NA"))
+        df['Created'] = pd.to_datetime(df['Created'], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d')
+        df['issue_url_display'] = df.pop('references_full').str.split('#', n=1).str[0] + '#' + df.pop('iid').astype(str)
         return df, None
 
     @staticmethod
     def generate_issue_analytics_report(gl_service, scope_id, scope_type, **kwargs):
         """Generates the Issue Analytics report."""
-        issues = gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, **kwargs)
-        if not issues: return pd.DataFrame(), "No issues found."
-        issue_data, project_name_cache = [], {}
-        for issue in issues:
-            issue_dict = issue.asdict()
-            project_id = issue_dict['project_id']
-            if project_id not in project_name_cache:
-                try: project_name_cache[project_id] = gl_service.gl.projects.get(project_id).name_with_namespace
-                except: project_name_cache[project_id] = "Unknown"
-            time_stats = issue_dict.get('time_stats', {})
-            effort_days = max(ReportGenerator._convert_seconds_to_man_days(time_stats.get('time_estimate', 0)),
-                              ReportGenerator._convert_seconds_to_man_days(time_stats.get('total_time_spent', 0)))
-            issue_type = next((l.split('::')[1] for l in issue_dict.get('labels', []) if l.startswith('type::')), "NA")
-            issue_data.append({
-                'IID': issue_dict.get('iid'), 'Type': issue_type, 'Title': issue_dict.get('title'),
-                'State': issue_dict.get('state'), 'URL': issue_dict.get('web_url'), 'Project': project_name_cache[project_id],
-                'Created At': pd.to_datetime(issue_dict.get('created_at')).strftime('%Y-%m-%d'),
-                'Updated At': pd.to_datetime(issue_dict.get('updated_at')).strftime('%Y-%m-%d'),
-                'Closed At': pd.to_datetime(issue_dict.get('closed_at')).strftime('%Y-%m-%d') if issue_dict.get('closed_at') else '',
-                'Due Date': issue_dict.get('due_date', ''), 'Labels': ', '.join(issue_dict.get('labels', [])),
-                'Milestone': issue_dict.get('milestone', {}).get('title', '') if issue_dict.get('milestone') else '',
-                'Assignee': issue_dict.get('assignee', {}).get('name', 'N/A') if issue_dict.get('assignee') else 'N/A',
-                'Assignees': ', '.join([a['name'] for a in issue_dict.get('assignees', [])]),
-                'Author': issue_dict.get('author', {}).get('name', 'N/A'),
-                'Effort (Man Days)': effort_days, 'Weight': issue_dict.get('weight')
-            })
-        return pd.DataFrame(issue_data), None
+        import numpy as np
+        import pandas as pd
+        columns = {field: [] for field in _ANALYTICS_FIELDS}
+        for page in gl_service.iter_issue_pages(scope_id=scope_id, scope_type=scope_type, **kwargs):
+            for field, values in columns.items():
+                values.extend(getattr(issue, field, None) for issue in page)
+        if not columns['iid']: return pd.DataFrame(), "No issues found."
+        df = pd.DataFrame(columns)
+
+        project_name_cache = gl_service.get_project_names(df['project_id'].unique().tolist())
+
+        issue_types = ReportGenerator._first_scoped_label(df['labels'], 'type::', "NA")
+
+        assignee_names = df['assignees'].explode().dropna().str.get('name')
+        assignees = assignee_names.groupby(level=0).agg(', '.join).reindex(df.index, fill_value='')
+
+        time_stats = df['time_stats']
+        effort_days = np.maximum(
+            ReportGenerator._convert_seconds_series_to_man_days(time_stats.str.get('time_estimate')),
+            ReportGenerator._convert_seconds_series_to_man_days(time_stats.str.get('total_time_spent'))
+        )
+
+        report_df = pd.DataFrame({
+            'IID': df['iid'], 'Type': issue_types, 'Title': df['title'],
+            'State': df['state'], 'URL': df['web_url'], 'Project': df['project_id'].map(project_name_cache),
+            'Created At': pd.to_datetime(df['created_at'], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d'),
+            'Updated At': pd.to_datetime(df['updated_at'], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d'),
+            'Closed At': pd.to_datetime(df['closed_at'], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d').fillna(''),
+            'Due Date': df['due_date'], 'Labels': df['labels'].str.join(', '),
+            'Milestone': df['milestone'].str.get('title').fillna(''),
+            'Assignee': df['assignee'].str.get('name').fillna('N/A'),
+            'Assignees': assignees,
+            'Author': df['author'].str.get('name').fillna('N/A'),
+            'Effort (Man Days)': effort_days, 'Weight': df['weight']
+        })
+        return report_df, None
     
     @staticmethod
     def generate_milestone_list(gl_service, scope_id, scope_type, start_date, end_date):
         """Generates a list of milestones with issue counts for a group or project."""
-        milestones = gl_service.get_milestones(scope_id, scope_type, start_date=start_date, end_date=end_date)
+        scope = gl_service.get_scope_object(scope_id, scope_type)
+        if not scope: return [], "Scope not found or access denied."
+        # One paginated GraphQL query returns every milestone with its issue counts,
+        # instead of one REST issue listing per milestone.
+        milestones = gl_service.get_milestone_stats(scope.full_path, scope_type, start_date, end_date)
         if not milestones: return [], "No milestones found for this scope."
         
         milestone_data = []
         for m in milestones:
-            issues = gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, milestone=m.title)
+            stats = m.get('stats') or {}
             milestone_data.append({
-                'id': m.id,
-                'group_id': m.group_id,
-                'title': m.title, 
-                'due_date': m.due_date,
-                'total_issues': len(issues), 
-                'closed_issues': sum(1 for i in issues if i.state == 'closed')
+                'id': int(m['id'].rsplit('/', 1)[-1]),
+                'group_id': scope_id if scope_type == 'group' else None,
+                'title': m['title'], 
+                'due_date': m.get('dueDate'),
+                'total_issues': stats.get('totalIssuesCount', 0), 
+                'closed_issues': stats.get('closedIssuesCount', 0)
             })
         return milestone_data, None
 
     @staticmethod
     def generate_detailed_milestone_report(gl_service, scope_id, scope_type, group_id, milestone_id):
         """Generates a detailed HTML report for a single milestone."""
+        import numpy as np
+        import pandas as pd
         milestone = gl_service.get_single_milestone(group_id, milestone_id)
         if not milestone: return None, "Milestone not found."
         milestone_data = milestone.asdict()
         issues = gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, milestone=milestone.title)
         total_issues = len(issues)
-        closed_issues = sum(1 for i in issues if i.state == 'closed')
+        closed_issues = ReportGenerator._count_closed(issues)
         stats = {
             'completion_percentage': round((closed_issues / total_issues * 100) if total_issues > 0 else 0, 2),
             'start_date': milestone_data.get('start_date', 'N/A'), 'due_date': milestone_data.get('due_date', 'N/A'),
@@ -572,21 +677,13 @@ class ReportGenerator:
                 start_date, due_date = datetime.strptime(start_date_str, '%Y-%m-%d'), datetime.strptime(due_date_str, '%Y-%m-%d')
                 if due_date >= start_date:
                     date_range = pd.date_range(start=start_date, end=due_date)
-                    burndown_data['labels'] = [d.strftime('%Y-%m-%d') for d in date_range]
-                    total_days = (due_date - start_date).days
-                    daily_burn_rate = total_issues / total_days if total_days > 0 else total_issues
-                    burndown_data['ideal'] = [max(0, total_issues - (i * daily_burn_rate)) for i in range(total_days + 1)]
-                    closed_issues_on_date = {d.strftime('%Y-%m-%d'): 0 for d in date_range}
-                    for issue in issues:
-                        if issue.state == 'closed' and issue.closed_at:
-                            closed_date_str = datetime.fromisoformat(issue.closed_at.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                            if closed_date_str in closed_issues_on_date: closed_issues_on_date[closed_date_str] += 1
-                    cumulative_closed = 0
-                    actual_burn = []
-                    for day_str in burndown_data['labels']:
-                        cumulative_closed += closed_issues_on_date.get(day_str, 0)
-                        actual_burn.append(total_issues - cumulative_closed)
-                    burndown_data['actual'] = actual_burn
+                    burndown_data['labels'] = date_range.strftime('%Y-%m-%d').tolist()
+                    burndown_data['ideal'] = np.linspace(total_issues, 0, len(date_range)).tolist()
+                    closed_dates = pd.to_datetime(
+                        [i.closed_at for i in issues if i.state == 'closed' and i.closed_at], utc=True, format='ISO8601'
+                    ).tz_convert(None).normalize()
+                    closed_per_day = closed_dates.value_counts().reindex(date_range, fill_value=0)
+                    burndown_data['actual'] = (total_issues - closed_per_day.cumsum()).tolist()
             except Exception as e:
                 current_app.logger.error(f"Could not generate burndown chart data: {e}")
                 burndown_data = {'labels': ['Start', 'End'], 'ideal': [total_issues, 0], 'actual': [total_issues, stats['open_issues']]}
@@ -597,36 +694,35 @@ class ReportGenerator:
     @staticmethod
     def generate_user_activity_report(gl_service, username, time_period):
         """Generates an activity report for a specific user."""
+        import pandas as pd
         params = {'assignee_username': username, 'scope': 'all'}
         if time_period == 'current':
             params['state'] = 'opened'
         elif time_period == 'last_week':
-            last_week = datetime.utcnow() - timedelta(days=7)
-            params['updated_after'] = last_week.isoformat()
-
-        issues = gl_service.get_all_issues(**params)
-        
-        if not issues:
+            params['updated_after'] = last_week_iso()
+
+        columns = {name: [] for name in (
+            'issue_iid', 'issue_title', 'issue_workflow_status', 'type_scoped_status',
+            'issue_created_date', 'issue_updated_date', 'estimated_efforts', 'web_url'
+        )}
+        for page in gl_service.iter_issue_pages(**params):
+            for issue in page:
+                time_stats = getattr(issue, 'time_stats', None) or {}
+                scopes = _scope_map(issue.labels)
+                columns['issue_iid'].append(issue.iid)
+                columns['issue_title'].append(issue.title)
+                columns['issue_workflow_status'].append(scopes.get('workflow', "NA").rpartition('::')[2])
+                columns['type_scoped_status'].append(scopes.get('type', "other").rpartition('::')[2])
+                columns['issue_created_date'].append(issue.created_at)
+                columns['issue_updated_date'].append(issue.updated_at)
+                columns['estimated_efforts'].append(time_stats.get('time_estimate', 0))
+                columns['web_url'].append(issue.web_url)
+
+        if not columns['issue_iid']:
             return pd.DataFrame(), "No issues found for this user in the specified period."
 
-        issue_data = []
-        for issue in issues:
-            issue_dict = issue.asdict()
-            time_stats = issue_dict.get('time_stats', {})
-            
-            workflow_status = next((l for l in issue.labels if l.startswith('workflow::')), "NA")
-            type_status = next((l for l in issue.labels if l.startswith('type::')), "type::other")
-
-            issue_data.append({
-                'issue_iid': issue.iid,
-                'issue_title': issue.title,
-                'issue_workflow_status': workflow_status.split('::')[-1],
-                'type_scoped_status': type_status.split('::')[-1],
-                'issue_created_date': pd.to_datetime(issue.created_at).strftime('%Y-%m-%d'),
-                'issue_updated_date': pd.to_datetime(issue.updated_at).strftime('%Y-%m-%d'),
-                'estimated_efforts': ReportGenerator._convert_seconds_to_man_days(time_stats.get('time_estimate', 0)),
-                'web_url': issue.web_url
-            })
-        
-        df = pd.DataFrame(issue_data)
+        df = pd.DataFrame(columns)
+        df['estimated_efforts'] = ReportGenerator._convert_seconds_series_to_man_days(df['estimated_efforts'])
+        for column in ('issue_created_date', 'issue_updated_date'):
+            df[column] = pd.to_datetime(df[column], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d')
         return df, None
\ No newline at end of file
@@ -1,21 +1,97 @@
 # /app/main/routes.py
 # Contains all the application routes (view functions).
 
+import re
+import functools
 import traceback
 import io
-from datetime import datetime, timedelta, timezone
+import tempfile
+from datetime import datetime, timezone
 
 from flask import (render_template, request, redirect, url_for, flash,
                    session, jsonify, send_file, current_app)
-import pandas as pd
+from markupsafe import Markup
 
 from app.main import bp
 from app.main.forms import ConnectionForm
-from app.main.services import GitLabService
-from app.main.logic import ReportGenerator, AutomationLogic
+from app.main.services import get_gitlab_service, run_concurrently
+from app.main.jobs import submit_job, get_job
+from app.main.session_store import get_session_value, set_session_value, clear_session_data
+from app.main.logic import ReportGenerator, AutomationLogic, last_week_iso
+
+@functools.lru_cache(maxsize=64)
+def _prefix_matcher(prefixes):
+    """
+    Compiles label prefixes into one anchored alternation, longest first, and maps
+    each prefix to every requested prefix it implies (itself and its own prefixes).
+    """
+    pattern = re.compile('|'.join(re.escape(p) for p in sorted(prefixes, key=len, reverse=True)))
+    implied = {p: [q for q in prefixes if p.startswith(q)] for p in prefixes}
+    return pattern, implied
+
+def _missing_prefixes(labels, prefixes):
+    """Returns the prefixes, in order, that none of the labels start with."""
+    pattern, implied = _prefix_matcher(prefixes)
+    present = set()
+    for label in labels:
+        match = pattern.match(label)
+        if match:
+            present.update(implied[match.group()])
+    return [p for p in prefixes if p not in present]
+
+@functools.lru_cache(maxsize=8)
+def _label_options_html(labels):
+    """
+    Pre-renders a label <select>'s options once per possible selection (None for
+    no selection), so the suggestion cards only look up the matching fragment.
+    """
+    template = current_app.jinja_env.get_template('_label_options.html')
+    return {selected: Markup(template.render(labels=labels, selected=selected))
+            for selected in (None, *labels)}
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def _write_excel(report_df, sheet_name):
+    """
+    Writes a DataFrame to a temporary .xlsx file and returns it rewound. Rows are
+    streamed into a write-only workbook, so no in-memory cell model is built.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    header_font = Font(bold=True)
+    header = []
+    for column in report_df.columns:
+        cell = WriteOnlyCell(sheet, value=str(column))
+        cell.font = header_font
+        header.append(cell)
+    sheet.append(header)
+
+    # Convert column by column to native Python values; only columns with gaps need the None fill.
+    columns = []
+    for _, column in report_df.items():
+        if column.hasnans:
+            column = column.astype(object).where(column.notna(), None)
+        columns.append(column.tolist())
+    for row in zip(*columns):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+def _excel_response(report_df, sheet_name, download_name):
+    """Sends a DataFrame as an .xlsx attachment."""
+    return send_file(_write_excel(report_df, sheet_name), as_attachment=True, download_name=download_name, mimetype=XLSX_MIMETYPE)
 
 def _date_to_excel_ordinal(dt):
     """Converts a timezone-aware datetime object to an Excel ordinal number."""
+    import pandas as pd
+
     if pd.isnull(dt):
         return None
     # Ensure the datetime is timezone-aware (UTC) before calculations
@@ -29,18 +105,32 @@ def _date_to_excel_ordinal(dt):
     return float(delta.days) + (float(delta.seconds) / 86400)
 
 
+def _cached_groups():
+    """
+    Returns the user's groups from the server-side session store, refetching them
+    if the stored copy has expired.
+    """
+    groups = get_session_value('cached_groups')
+    if groups is None:
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+        raw_groups = gl_service.get_user_groups()
+        groups = [{'id': g.id, 'name': g.name} for g in raw_groups] if raw_groups else []
+        set_session_value('cached_groups', groups)
+    return groups
+
+
 @bp.route('/', methods=['GET', 'POST'])
 def index():
     form = ConnectionForm()
     if form.validate_on_submit():
         try:
-            gl_service = GitLabService(form.gitlab_url.data, form.access_token.data)
+            gl_service = get_gitlab_service(form.gitlab_url.data, form.access_token.data)
             raw_groups = gl_service.get_user_groups()
-            session['cached_groups'] = [{'id': g.id, 'name': g.name} for g in raw_groups] if raw_groups else []
             session['gitlab_url'] = form.gitlab_url.data
             session['access_token'] = form.access_token.data
             session['is_connected'] = True
-            session['cached_scope_data'] = {}
+            set_session_value('cached_groups', [{'id': g.id, 'name': g.name} for g in raw_groups] if raw_groups else [])
+            set_session_value('cached_scope_data', {})
             flash('Connection to GitLab established successfully!', 'success')
             return redirect(url_for('main.dashboard'))
         except Exception as e:
@@ -51,19 +141,19 @@ def index():
 @bp.route('/dashboard')
 def dashboard():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
-    groups = session.get('cached_groups', [])
+    groups = _cached_groups()
     return render_template('dashboard.html', groups=groups)
 
 @bp.route('/automations')
 def automations_page():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
-    groups = session.get('cached_groups', [])
+    groups = _cached_groups()
     return render_template('automations.html', groups=groups)
 
 @bp.route('/search')
 def search_export_page():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
-    groups = session.get('cached_groups', [])
+    groups = _cached_groups()
     return render_template('search_export.html', groups=groups)
 
 @bp.route('/team_activity')
@@ -74,41 +164,59 @@ def team_activity_page():
 @bp.route('/lead_cycle_time')
 def lead_cycle_time_page():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
-    groups = session.get('cached_groups', [])
+    groups = _cached_groups()
     return render_template('lead_cycle_time.html', groups=groups)
 
 @bp.route('/logout')
 def logout():
+    clear_session_data()
     session.clear()
     flash('You have been logged out.', 'info')
     return redirect(url_for('main.index'))
 
 # --- API/AJAX Routes ---
 
-@bp.route('/api/get_group_children', methods=['POST'])
-def get_group_children():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    group_id = request.json.get('group_id')
-    if not group_id: return jsonify({'error': 'Group ID is required'}), 400
+def json_api(*required, error=None):
+    """
+    Guards a JSON API view: rejects unauthenticated sessions, parses the body once,
+    checks that each required field is present and non-empty, and passes the parsed
+    body to the view as `data`.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Request body must be a JSON object.'}), 400
+            missing = [field for field in required if not data.get(field)]
+            if missing:
+                return jsonify({'error': error or f"Missing required fields: {', '.join(missing)}"}), 400
+            return view(*args, data=data, **kwargs)
+        return wrapper
+    return decorator
 
-    if 'cached_scope_data' not in session:
-        session['cached_scope_data'] = {}
+@bp.route('/api/get_group_children', methods=['POST'])
+@json_api('group_id', error='Group ID is required')
+def get_group_children(data):
+    group_id = data['group_id']
 
-    if str(group_id) in session['cached_scope_data']:
+    scope_cache = get_session_value('cached_scope_data', {})
+    if str(group_id) in scope_cache:
         current_app.logger.info(f"Returning cached data for group ID: {group_id}")
-        return jsonify(session['cached_scope_data'][str(group_id)])
+        return jsonify(scope_cache[str(group_id)])
 
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
-        data = gl_service.get_group_details(group_id)
-        if data is None: return jsonify({'error': 'Group not found or access denied'}), 404
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+        details = gl_service.get_group_details(group_id)
+        if details is None: return jsonify({'error': 'Group not found or access denied'}), 404
         response_data = {
-            'subgroups': [{'id': sg.id, 'name': sg.name} for sg in data['subgroups']],
-            'projects': [{'id': p.id, 'name': p.name} for p in data['projects']]
+            'subgroups': [{'id': sg.id, 'name': sg.name} for sg in details['subgroups']],
+            'projects': [{'id': p.id, 'name': p.name} for p in details['projects']]
         }
         
-        session['cached_scope_data'][str(group_id)] = response_data
-        session.modified = True
+        scope_cache[str(group_id)] = response_data
+        set_session_value('cached_scope_data', scope_cache)
         current_app.logger.info(f"Fetched and cached new data for group ID: {group_id}")
 
         return jsonify(response_data)
@@ -116,9 +224,8 @@ def get_group_children():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/api/generate_report', methods=['POST'])
-def generate_report():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
+@json_api()
+def generate_report(data):
     report_type = data.get('report_type')
     
     required_params = ['report_type', 'scope_id']
@@ -138,7 +245,7 @@ def generate_report():
         return jsonify({'error': f'Missing required parameters for {report_type}'}), 400
 
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         
         report_html, error_msg, report_title = "", None, "Report"
         
@@ -146,7 +253,7 @@ def generate_report():
             report_title = "Epic Report"
             report_df, error_msg = ReportGenerator.generate_epic_report(gl_service, data['scope_id'], data['epic_iid'])
             if not error_msg:
-                report_html = render_template('_epic_report_results.html', issues=report_df.to_dict('records'))
+                report_html = render_template('_epic_report_results.html', issues=report_df.rename(columns={'Milestone Date': 'Milestone_Date'}).itertuples(index=False, name='Issue'))
         elif report_type == 'defect_trend':
             report_title = "Defect Escape Trend"
             chart_data, error_msg = ReportGenerator.generate_defect_trend_report(
@@ -192,7 +299,7 @@ def generate_report():
                 gl_service, data['scope_id'], data['scope_type'], data['months'], data['stage_labels']
             )
             if not error_msg:
-                session['time_in_status_df'] = report_df.to_json()
+                set_session_value('time_in_status_df', report_df)
                 return jsonify({'chart_data': chart_data, 'title': report_title, 'download_url': url_for('main.download_time_in_status_report')})
         elif report_type == 'milestone_analytics':
             report_title = "Milestone Analytics"
@@ -205,6 +312,8 @@ def generate_report():
                                               scope_id=data['scope_id'], 
                                               scope_type=data['scope_type'])
         else:
+            import pandas as pd
+
             report_df = pd.DataFrame()
             if report_type == 'defect_escape':
                 report_title = "Defect Escape Ratio"
@@ -216,7 +325,7 @@ def generate_report():
                 report_title = "Issue Analytics"
                 report_df, error_msg = ReportGenerator.generate_issue_analytics_report(gl_service, data['scope_id'], data['scope_type'], created_after=data['start_date'], created_before=data['end_date'])
             
-            if not error_msg: report_html = report_df.to_html(classes='table table-striped table-bordered table-hover table-responsive', index=False, border=0)
+            if not error_msg: report_html = render_template('_generic_table.html', rows=report_df.itertuples(index=False, name=None), columns=list(report_df.columns))
         
         if error_msg: return jsonify({'error': error_msg}), 500
         return jsonify({'report_html': report_html, 'download_url': url_for('main.download_report', **data), 'title': report_title})
@@ -224,6 +333,57 @@ def generate_report():
         current_app.logger.error(f"Report generation failed: {e}\n{traceback.format_exc()}")
         return jsonify({'error': f'An internal error occurred: {e}'}), 500
 
+def _build_download_report(gl_service, args):
+    """Builds the DataFrame exported by a report download, returning (report_df, error_msg)."""
+    import pandas as pd
+
+    report_type = args.get('report_type')
+    report_df, error_msg = pd.DataFrame(), None
+    
+    if report_type == 'epic_report':
+        report_df, error_msg = ReportGenerator.generate_epic_report(gl_service, args.get('scope_id'), args.get('epic_iid'))
+    elif report_type == 'issue_analytics':
+        report_df, error_msg = ReportGenerator.generate_issue_analytics_report(gl_service, args.get('scope_id'), args.get('scope_type'), created_after=args.get('start_date'), created_before=args.get('end_date'))
+    elif report_type == 'defect_escape':
+        report_df, error_msg = ReportGenerator.generate_defect_escape_report(
+            gl_service, args.get('scope_id'), args.get('scope_type'), 
+            args.get('start_date'), args.get('end_date'),
+            args.get('qa_labels'), args.get('prod_labels')
+        )
+    elif report_type == 'triage_to_milestone':
+        # Convert string 'true'/'false' from URL args to boolean
+        include_next = args.get('include_next_milestones', 'false').lower() == 'true'
+        report_df, error_msg = ReportGenerator.generate_triage_to_milestone_report(
+            gl_service, args.get('scope_id'), args.get('scope_type'), 
+            args.get('start_date'), args.get('end_date'),
+            filter_labels=args.get('filter_labels'),
+            include_next_milestones=include_next
+        )
+        if not error_msg and not report_df.empty:
+            report_df['issue_hyperlink'] = report_df.apply(
+                lambda row: f'=HYPERLINK("{row["issue_url"]}", "{row["issue_iid"]}")',
+                axis=1
+            )
+            
+            export_df = pd.DataFrame()
+            export_df['project'] = report_df['project_name']
+            export_df['issue iid'] = report_df['issue_hyperlink']
+            export_df['type'] = report_df['issue_type']
+            export_df['milestone date'] = report_df['milestone_due_date'].apply(_date_to_excel_ordinal)
+            export_df['date when milestone was added to the issue'] = report_df['milestone_assigned_date'].apply(_date_to_excel_ordinal)
+            export_df['difference in days'] = report_df['lag_days']
+            report_df = export_df
+    return report_df, error_msg
+
+def _build_report_workbook(gl_service, args):
+    """Background job body: builds a report download and returns (file name, .xlsx bytes)."""
+    report_type = args['report_type']
+    report_df, error_msg = _build_download_report(gl_service, args)
+    if error_msg:
+        raise ValueError(error_msg)
+    with _write_excel(report_df, report_type) as output:
+        return f"{report_type}_report.xlsx", output.read()
+
 @bp.route('/download_report')
 def download_report():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
@@ -233,56 +393,53 @@ def download_report():
         flash('Invalid download request.', 'danger')
         return redirect(url_for('main.dashboard'))
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
-        report_df, error_msg = pd.DataFrame(), None
-        
-        if report_type == 'epic_report':
-            report_df, error_msg = ReportGenerator.generate_epic_report(gl_service, args.get('scope_id'), args.get('epic_iid'))
-        elif report_type == 'issue_analytics':
-            report_df, error_msg = ReportGenerator.generate_issue_analytics_report(gl_service, args.get('scope_id'), args.get('scope_type'), created_after=args.get('start_date'), created_before=args.get('end_date'))
-        elif report_type == 'defect_escape':
-            report_df, error_msg = ReportGenerator.generate_defect_escape_report(
-                gl_service, args.get('scope_id'), args.get('scope_type'), 
-                args.get('start_date'), args.get('end_date'),
-                args.get('qa_labels'), args.get('prod_labels')
-            )
-        elif report_type == 'triage_to_milestone':
-            # Convert string 'true'/'false' from URL args to boolean
-            include_next = args.get('include_next_milestones', 'false').lower() == 'true'
-            report_df, error_msg = ReportGenerator.generate_triage_to_milestone_report(
-                gl_service, args.get('scope_id'), args.get('scope_type'), 
-                args.get('start_date'), args.get('end_date'),
-                filter_labels=args.get('filter_labels'),
-                include_next_milestones=include_next
-            )
-            if not error_msg and not report_df.empty:
-                report_df['issue_hyperlink'] = report_df.apply(
-                    lambda row: f'=HYPERLINK("{row["issue_url"]}", "{row["issue_iid"]}")',
-                    axis=1
-                )
-                
-                export_df = pd.DataFrame()
-                export_df['project'] = report_df['project_name']
-                export_df['issue iid'] = report_df['issue_hyperlink']
-                export_df['type'] = report_df['issue_type']
-                export_df['milestone date'] = report_df['milestone_due_date'].apply(_date_to_excel_ordinal)
-                export_df['date when milestone was added to the issue'] = report_df['milestone_assigned_date'].apply(_date_to_excel_ordinal)
-                export_df['difference in days'] = report_df['lag_days']
-                report_df = export_df
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+        report_df, error_msg = _build_download_report(gl_service, args)
         
         if error_msg:
             flash(f"Error generating download: {error_msg}", "danger")
             return redirect(url_for('main.dashboard'))
         
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            report_df.to_excel(writer, index=False, sheet_name=report_type)
-        output.seek(0)
-        return send_file(output, as_attachment=True, download_name=f"{report_type}_report.xlsx", mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        return _excel_response(report_df, report_type, f"{report_type}_report.xlsx")
     except Exception as e:
         flash(f"An unexpected error occurred: {e}", "danger")
         return redirect(url_for('main.dashboard'))
 
+@bp.route('/api/report_jobs', methods=['POST'])
+@json_api('report_type', error='Missing report type')
+def start_report_job(data):
+    """Queues a report download on the background pool so the request returns at once."""
+    args = {key: str(value) for key, value in data.items()}
+    try:
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+        job_id = submit_job(gl_service.cache_key, _build_report_workbook, gl_service, args)
+        return jsonify({'job_id': job_id, 'status_url': url_for('main.report_job_status', job_id=job_id)}), 202
+    except Exception as e:
+        current_app.logger.error(f"Failed to queue report job: {e}")
+        return jsonify({'error': f'An internal error occurred: {e}'}), 500
+
+@bp.route('/api/report_jobs/<job_id>')
+def report_job_status(job_id):
+    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
+    gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+    job = get_job(job_id, gl_service.cache_key)
+    if job is None: return jsonify({'error': 'Job not found'}), 404
+    response = {'state': job['state'], 'error': job['error']}
+    if job['state'] == 'finished':
+        response['result_url'] = url_for('main.download_report_job', job_id=job_id)
+    return jsonify(response)
+
+@bp.route('/api/report_jobs/<job_id>/download')
+def download_report_job(job_id):
+    if not session.get('is_connected'): return redirect(url_for('main.index'))
+    gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+    job = get_job(job_id, gl_service.cache_key)
+    if job is None or job['state'] != 'finished':
+        flash('The requested report is not available.', 'danger')
+        return redirect(url_for('main.dashboard'))
+    download_name, content = job['result']
+    return send_file(io.BytesIO(content), as_attachment=True, download_name=download_name, mimetype=XLSX_MIMETYPE)
+
 @bp.route('/download_detailed_milestone_report')
 def download_detailed_milestone_report():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
@@ -295,7 +452,7 @@ def download_detailed_milestone_report():
         flash('Scope, Group ID and Milestone ID are required.', 'danger')
         return redirect(url_for('main.dashboard'))
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         report_html, error_msg = ReportGenerator.generate_detailed_milestone_report(
             gl_service, scope_id, scope_type, group_id, milestone_id
         )
@@ -310,54 +467,61 @@ def download_detailed_milestone_report():
         return redirect(url_for('main.dashboard'))
                             
 @bp.route('/api/label_generator', methods=['POST'])
-def label_generator():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    scope_id, scope_type, prefixes_str = data.get('scope_id'), data.get('scope_type'), data.get('prefixes')
-    start_date, end_date = data.get('start_date'), data.get('end_date')
+@json_api('scope_id', 'scope_type', 'prefixes', 'start_date', 'end_date',
+          error='Scope, label prefixes, and date range are required.')
+def label_generator(data):
+    scope_id, scope_type, prefixes_str = data['scope_id'], data['scope_type'], data['prefixes']
+    start_date, end_date = data['start_date'], data['end_date']
 
-    if not all([scope_id, scope_type, prefixes_str, start_date, end_date]):
-        return jsonify({'error': 'Scope, label prefixes, and date range are required.'}), 400
-    
-    prefixes = [p.strip() for p in prefixes_str.split(',') if p.strip()]
+    prefixes = tuple(p.strip() for p in prefixes_str.split(',') if p.strip())
     if not prefixes:
         return jsonify({'error': 'Please provide at least one label prefix to check.'}), 400
 
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         issues = gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, state='opened', created_after=start_date, created_before=end_date)
         
         issues_with_suggestions = []
         for issue in issues:
             existing_labels = issue.labels
-            missing_prefixes = [p for p in prefixes if not any(l.startswith(p) for l in existing_labels)]
+            missing_prefixes = _missing_prefixes(existing_labels, prefixes)
             
             if missing_prefixes:
-                suggestions = AutomationLogic.suggest_labels_scoped(issue, existing_labels)
-                issue_dict = issue.asdict()
-                issue_dict['suggestions'] = suggestions
-                issues_with_suggestions.append(issue_dict)
+                issues_with_suggestions.append({
+                    'iid': issue.iid,
+                    'title': issue.title,
+                    'labels': existing_labels,
+                    'web_url': issue.web_url,
+                    'project_id': issue.project_id,
+                    'project_path': issue.references['full'].partition('#')[0],
+                    'suggestions': AutomationLogic.suggest_labels_scoped(issue, existing_labels)
+                })
         
         report_html = render_template('_label_suggestion_results.html', 
                                       issues=issues_with_suggestions,
-                                      type_labels=current_app.config['TYPE_LABELS'],
-                                      workflow_labels=current_app.config['WORKFLOW_LABELS'],
-                                      priority_labels=current_app.config['PRIORITY_LABELS'])
+                                      type_options=_label_options_html(current_app.config['TYPE_LABELS']),
+                                      workflow_options=_label_options_html(current_app.config['WORKFLOW_LABELS']),
+                                      priority_options=_label_options_html(current_app.config['PRIORITY_LABELS']))
         return jsonify({'html': report_html})
     except Exception as e:
         current_app.logger.error(f"Label generator failed: {e}\n{traceback.format_exc()}")
         return jsonify({'error': f'An internal error occurred: {e}'}), 500
 
+def _is_label_list(labels):
+    """True if labels is a JSON list of label names."""
+    return isinstance(labels, list) and all(isinstance(label, str) for label in labels)
+
 @bp.route('/api/update_labels', methods=['POST'])
-def update_labels():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    project_id, issue_iid, labels = data.get('project_id'), data.get('issue_iid'), data.get('labels')
-    if not all([project_id, issue_iid, labels]):
-        return jsonify({'error': 'Missing parameters for label update.'}), 400
-    
+@json_api('project_id', 'issue_iid', 'labels', error='Missing parameters for label update.')
+def update_labels(data):
+    project_id, issue_iid, labels = data['project_id'], data['issue_iid'], data['labels']
+    if not _is_label_list(labels):
+        return jsonify({'success': False, 'message': 'Labels must be a list of label names.'}), 400
+    if not current_app.config['SUGGESTION_LABELS'].issuperset(labels):
+        return jsonify({'success': False, 'message': 'Only the predefined workflow, type and priority labels can be applied.'}), 400
+
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         success, error_msg = gl_service.update_issue_labels(project_id, issue_iid, labels)
         if success:
             return jsonify({'success': True, 'message': f'Labels for issue #{issue_iid} updated successfully!'})
@@ -367,15 +531,41 @@ def update_labels():
         current_app.logger.error(f"Update labels failed: {e}\n{traceback.format_exc()}")
         return jsonify({'success': False, 'message': f'An internal error occurred: {e}'}), 500
 
+@bp.route('/api/update_labels_bulk', methods=['POST'])
+@json_api('updates', error='Missing parameters for label update.')
+def update_labels_bulk(data):
+    """Applies several issues' label updates concurrently and reports each outcome."""
+    updates = data['updates']
+    if not isinstance(updates, list) or not all(isinstance(u, dict) for u in updates):
+        return jsonify({'error': 'Updates must be a list of objects.'}), 400
+    if not all(u.get('project_id') and u.get('issue_iid') and u.get('labels') for u in updates):
+        return jsonify({'error': 'Missing parameters for label update.'}), 400
+    if not all(_is_label_list(u['labels']) for u in updates):
+        return jsonify({'error': 'Labels must be a list of label names.'}), 400
+    allowed_labels = current_app.config['SUGGESTION_LABELS']
+    if not all(allowed_labels.issuperset(u['labels']) for u in updates):
+        return jsonify({'error': 'Only the predefined workflow, type and priority labels can be applied.'}), 400
+
+    gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
+
+    def apply_update(update):
+        try:
+            success, error_msg = gl_service.update_issue_labels(update['project_id'], update['issue_iid'], update['labels'])
+        except Exception as e:
+            current_app.logger.error(f"Update labels failed for issue #{update['issue_iid']}: {e}")
+            success, error_msg = False, str(e)
+        return {'project_id': update['project_id'], 'issue_iid': update['issue_iid'],
+                'success': success, 'message': error_msg}
+
+    results = run_concurrently(apply_update, updates, max_workers=10)
+    return jsonify({'results': results})
+
 @bp.route('/api/prd_to_story', methods=['POST'])
-def prd_to_story():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    prd_text = data.get('prd_text')
+@json_api('prd_text', error='PRD text is required.')
+def prd_to_story(data):
+    prd_text = data['prd_text']
     project_id = data.get('project_id')
-    if not prd_text:
-        return jsonify({'error': 'PRD text is required.'}), 400
-    
+
     stories, error = AutomationLogic.generate_stories_from_prd(prd_text)
     
     if error:
@@ -385,14 +575,11 @@ def prd_to_story():
     return jsonify({'html': html})
 
 @bp.route('/api/create_issue', methods=['POST'])
-def create_issue():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    project_id, title, description = data.get('project_id'), data.get('title'), data.get('description')
-    if not all([project_id, title, description]):
-        return jsonify({'error': 'Project ID, title, and description are required.'}), 400
+@json_api('project_id', 'title', 'description', error='Project ID, title, and description are required.')
+def create_issue(data):
+    project_id, title, description = data['project_id'], data['title'], data['description']
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         issue, error = gl_service.create_issue(project_id, title, description)
         if error:
             return jsonify({'success': False, 'error': error})
@@ -402,15 +589,12 @@ def create_issue():
         return jsonify({'success': False, 'error': f'An internal error occurred: {e}'}), 500
 
 @bp.route('/api/get_scope_data', methods=['POST'])
-def get_scope_data():
+@json_api('scope_id', 'scope_type', error='Scope ID and type are required.')
+def get_scope_data(data):
     """Fetches milestones for the search filter dropdowns."""
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    scope_id, scope_type = data.get('scope_id'), data.get('scope_type')
-    if not scope_id or not scope_type:
-        return jsonify({'error': 'Scope ID and type are required.'}), 400
+    scope_id, scope_type = data['scope_id'], data['scope_type']
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         
         milestones_list = []
         if scope_type == 'group':
@@ -421,13 +605,48 @@ def get_scope_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
         
+def _search_issue_rows(gl_service, scope_id, scope_type, search_params):
+    """
+    Builds the issue search table rows. Scoped searches use the slim GraphQL issue
+    list; instance-wide searches, searches for several authors (which GraphQL cannot
+    filter the way REST does), or a failed GraphQL query fall back to REST.
+    """
+    authors = search_params.get('author_username', ())
+    use_graphql = scope_id and scope_type and len(authors) <= 1
+    scope = gl_service.get_scope_object(scope_id, scope_type) if use_graphql else None
+    issues = scope and gl_service.get_issue_list(
+        scope.full_path, scope_type,
+        search=search_params.get('search'),
+        assignee_usernames=tuple(search_params.get('assignee_username', ())),
+        author_username=authors[0] if authors else None,
+        milestone=search_params.get('milestone'),
+        labels=tuple(l.strip() for l in search_params.get('labels', '').split(',') if l.strip())
+    )
+    if issues is not None:
+        rows = [{
+            'iid': issue['iid'], 'title': issue['title'], 'web_url': issue['web_url'],
+            'assignee': issue['assignee'] or 'None',
+            'author': issue['author'], 'labels': ', '.join(issue['labels'])
+        } for issue in issues]
+        seconds = [issue['time_estimate'] for issue in issues]
+    else:
+        all_issues = gl_service.get_all_issues(scope_id=scope_id, scope_type=scope_type, **search_params)
+        rows = [{
+            'iid': issue.iid, 'title': issue.title, 'web_url': issue.web_url,
+            'assignee': issue.assignee['name'] if issue.assignee else 'None',
+            'author': issue.author['name'], 'labels': ', '.join(issue.labels)
+        } for issue in all_issues]
+        seconds = [issue.time_stats.get('time_estimate') for issue in all_issues]
+
+    for row, effort in zip(rows, ReportGenerator._convert_seconds_list_to_man_days(seconds)):
+        row['estimated_effort'] = effort
+    return rows
+
 @bp.route('/api/search_issues', methods=['POST'])
-def search_issues():
+@json_api()
+def search_issues(data):
     """Handles the main issue search without pagination."""
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    
-    gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+    gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
     
     search_params = {}
     if data.get('search_text'): search_params['search'] = data.get('search_text')
@@ -442,15 +661,8 @@ def search_issues():
     if data.get('milestone'): search_params['milestone'] = data.get('milestone')
     if data.get('labels'): search_params['labels'] = data.get('labels')
 
-    all_issues = gl_service.get_all_issues(scope_id=data.get('scope_id'), scope_type=data.get('scope_type'), **search_params)
-    
-    issue_data = [{
-        'iid': issue.iid, 'title': issue.title, 'web_url': issue.web_url,
-        'assignee': issue.assignee['name'] if issue.assignee else 'None',
-        'author': issue.author['name'], 'labels': ', '.join(issue.labels),
-        'estimated_effort': ReportGenerator._convert_seconds_to_man_days(issue.time_stats.get('time_estimate', 0))
-    } for issue in all_issues]
-        
+    issue_data = _search_issue_rows(gl_service, data.get('scope_id'), data.get('scope_type'), search_params)
+
     html = render_template('_search_results.html', issues=issue_data)
     return jsonify({'html': html})
 
@@ -459,7 +671,7 @@ def download_search_results():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
     args = request.args.to_dict()
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         
         search_params = {k: v for k, v in args.items() if k not in ['scope_id', 'scope_type'] and v}
         
@@ -475,23 +687,17 @@ def download_search_results():
             flash(f"Error generating download: {error_msg}", "danger")
             return redirect(url_for('main.search_export_page'))
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            report_df.to_excel(writer, index=False, sheet_name='search_results')
-        output.seek(0)
-        return send_file(output, as_attachment=True, download_name="issue_search_results.xlsx", mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        return _excel_response(report_df, 'search_results', "issue_search_results.xlsx")
     except Exception as e:
         flash(f"An unexpected error occurred: {e}", "danger")
         return redirect(url_for('main.search_export_page'))
 
 @bp.route('/api/search_users', methods=['POST'])
-def search_users():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    search_term = request.json.get('search_term')
-    if not search_term:
-        return jsonify({'error': 'Search term is required'}), 400
+@json_api('search_term', error='Search term is required')
+def search_users(data):
+    search_term = data['search_term']
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         users = gl_service.search_users(search_term)
         user_data = [{'id': u.username, 'text': f"{u.name} ({u.username})"} for u in users]
         return jsonify(user_data)
@@ -499,42 +705,47 @@ def search_users():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/api/get_user_activity', methods=['POST'])
-def get_user_activity():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    username = data.get('username')
-    time_period = data.get('time_period') # 'current' or 'last_week'
-    
-    if not username or not time_period:
-        return jsonify({'error': 'Username and time period are required.'}), 400
-        
+@json_api('username', 'time_period', error='Username and time period are required.')
+def get_user_activity(data):
+    username = data['username']
+    time_period = data['time_period'] # 'current' or 'last_week'
+
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         
         mr_params = {'scope': 'all'}
         if time_period == 'current':
             mr_params['state'] = 'opened'
         elif time_period == 'last_week':
-            last_week = datetime.utcnow() - timedelta(days=7)
-            mr_params['updated_after'] = last_week.isoformat()
+            mr_params['updated_after'] = last_week_iso()
+
+        # Locked MRs are counted too, so the total matches the REST listing's, which has every state.
+        mr_count_states = ('opened',) if time_period == 'current' else ('opened', 'merged', 'closed', 'locked')
+
+        def count_merge_requests():
+            # A single GraphQL count query; page through the REST listing only if it fails.
+            counts = gl_service.get_user_merge_request_counts(username, mr_count_states, mr_params.get('updated_after'))
+            return counts if counts is not None else gl_service.count_user_merge_requests_by_state(username, **mr_params)
+
+        # The MR summary and the assigned-issue table come from different endpoints; fetch them side by side.
+        mr_states, (report_df, error_msg) = run_concurrently(lambda fetch: fetch(), [
+            count_merge_requests,
+            lambda: ReportGenerator.generate_user_activity_report(gl_service, username, time_period)
+        ], max_workers=2)
+
+        if error_msg:
+            return jsonify({'error': error_msg}), 404
 
-        mrs = gl_service.get_user_merge_requests(username, **mr_params)
-        
         summary = {
-            'total_mrs': len(mrs),
-            'mrs_opened': sum(1 for mr in mrs if mr.state == 'opened'),
-            'mrs_merged': sum(1 for mr in mrs if mr.state == 'merged'),
-            'mrs_closed': sum(1 for mr in mrs if mr.state == 'closed'),
+            'total_mrs': sum(mr_states.values()),
+            'mrs_opened': mr_states['opened'],
+            'mrs_merged': mr_states['merged'],
+            'mrs_closed': mr_states['closed'],
         }
         summary_html = render_template('_user_activity_summary.html', summary=summary, time_period=time_period)
-        
-        report_df, error_msg = ReportGenerator.generate_user_activity_report(gl_service, username, time_period)
-        
-        if error_msg:
-            return jsonify({'error': error_msg}), 404
 
         table_html = render_template('_user_work_table.html', 
-                                     issues=report_df.to_dict('records'),
+                                     issues=report_df.itertuples(index=False, name='Issue'),
                                      username=username,
                                      time_period=time_period)
                                      
@@ -558,32 +769,24 @@ def download_user_activity():
         return redirect(url_for('main.team_activity_page'))
 
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         report_df, error_msg = ReportGenerator.generate_user_activity_report(gl_service, username, time_period)
 
         if error_msg:
             flash(f"Error generating download: {error_msg}", "danger")
             return redirect(url_for('main.team_activity_page'))
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            report_df.to_excel(writer, index=False, sheet_name=f'{username}_{time_period}_work')
-        output.seek(0)
-        return send_file(output, as_attachment=True, download_name=f"{username}_{time_period}_activity.xlsx", mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        return _excel_response(report_df, f'{username}_{time_period}_work', f"{username}_{time_period}_activity.xlsx")
     except Exception as e:
         flash(f"An unexpected error occurred: {e}", "danger")
         return redirect(url_for('main.team_activity_page'))
 
 @bp.route('/api/search_epics', methods=['POST'])
-def search_epics():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    group_id = data.get('group_id')
-    search_term = data.get('search_term')
-    if not group_id or not search_term:
-        return jsonify({'error': 'Group ID and search term are required'}), 400
+@json_api('group_id', 'search_term', error='Group ID and search term are required')
+def search_epics(data):
+    group_id, search_term = data['group_id'], data['search_term']
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         epics = gl_service.get_group_epics(group_id, search_term)
         epic_data = [{'id': e.iid, 'text': f"#{e.iid} - {e.title}"} for e in epics]
         return jsonify(epic_data)
@@ -591,19 +794,13 @@ def search_epics():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/api/get_lead_cycle_time', methods=['POST'])
-def get_lead_cycle_time():
-    if not session.get('is_connected'): return jsonify({'error': 'Not authenticated'}), 401
-    data = request.json
-    scope_id = data.get('scope_id')
-    scope_type = data.get('scope_type')
-    start_date = data.get('start_date')
-    end_date = data.get('end_date')
-
-    if not all([scope_id, scope_type, start_date, end_date]):
-        return jsonify({'error': 'Scope, start date, and end date are required.'}), 400
+@json_api('scope_id', 'scope_type', 'start_date', 'end_date', error='Scope, start date, and end date are required.')
+def get_lead_cycle_time(data):
+    scope_id, scope_type = data['scope_id'], data['scope_type']
+    start_date, end_date = data['start_date'], data['end_date']
 
     try:
-        gl_service = GitLabService(session['gitlab_url'], session['access_token'])
+        gl_service = get_gitlab_service(session['gitlab_url'], session['access_token'])
         scope_object = gl_service.get_scope_object(scope_id, scope_type)
         if not scope_object:
             return jsonify({'error': 'Scope not found or access denied.'}), 404
@@ -631,18 +828,13 @@ def get_lead_cycle_time():
 def download_time_in_status_report():
     if not session.get('is_connected'): return redirect(url_for('main.index'))
     
-    df_json = session.get('time_in_status_df')
-    if not df_json:
+    report_df = get_session_value('time_in_status_df')
+    if report_df is None:
         flash('No report data found to download.', 'danger')
         return redirect(url_for('main.dashboard'))
         
     try:
-        report_df = pd.read_json(df_json)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            report_df.to_excel(writer, index=False, sheet_name='time_in_status')
-        output.seek(0)
-        return send_file(output, as_attachment=True, download_name="time_in_status_report.xlsx", mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        return _excel_response(report_df, 'time_in_status', "time_in_status_report.xlsx")
     except Exception as e:
         flash(f"An unexpected error occurred during download: {e}", "danger")
         return redirect(url_for('main.dashboard'))
@@ -5,12 +5,228 @@ import gitlab
 import requests
 from flask import current_app
 import urllib3
-import re
 import json
+import time
+import hashlib
+import copy
+import functools
+import threading
+import itertools
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from gitlab.base import RESTObject
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_dumps(obj):
+    """Serializes obj to JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _json_loads(data):
+    """Parses JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 # Suppress the InsecureRequestWarning from urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Upper bound on concurrent GitLab requests issued by a single fan-out.
+MAX_WORKERS = 16
+# How often a rate-limited GraphQL query is retried before giving up.
+GRAPHQL_RATE_LIMIT_RETRIES = 3
+
+# Marks threads that are running a run_concurrently item.
+_fan_out_state = threading.local()
+
+def run_concurrently(func, items, max_workers=MAX_WORKERS):
+    """
+    Maps func over items on a thread pool, preserving order and the Flask app context.
+    Calls made from inside another fan-out run in sequence instead, so nested fan-outs
+    never multiply past MAX_WORKERS threads.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if getattr(_fan_out_state, 'active', False):
+        return [func(item) for item in items]
+    app = current_app._get_current_object()
+
+    def run_in_context(item):
+        _fan_out_state.active = True
+        with app.app_context():
+            return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(run_in_context, items))
+
+class TTLCache:
+    """A small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+    def __init__(self, maxsize=512, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Stores value under key, evicting the least recently used entries when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, predicate):
+        """Drops every entry whose key satisfies predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+def _connection_key(gitlab_url, private_token):
+    """Identifies a GitLab connection in shared caches without exposing the raw token."""
+    token_hash = hashlib.blake2b(private_token.encode(), digest_size=8).hexdigest()
+    return (gitlab_url.rstrip('/'), token_hash)
+
+_MISSING = object()
+
+def _copy_rest_object(obj):
+    """Rebuilds a python-gitlab object from a deep copy of its attributes."""
+    return type(obj)(obj.manager, obj.asdict(), created_from_list=obj._created_from_list)
+
+def _copy_cached(value):
+    """Deep-copies a cached result, rebuilding python-gitlab objects rather than sharing them."""
+    if isinstance(value, RESTObject):
+        return _copy_rest_object(value)
+    if isinstance(value, list):
+        return [_copy_cached(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _copy_cached(item) for key, item in value.items()}
+    return copy.deepcopy(value)
+
+def cached_per_connection(cache):
+    """
+    Caches a GitLabService method's non-empty results per connection and arguments.
+    Empty results are not stored, since the service methods also return them on errors.
+    Every caller gets its own deep copy, so nothing can mutate the cached result.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                key = (self.cache_key, method.__name__, args, frozenset(kwargs.items()))
+                result = cache.get(key, _MISSING)
+            except TypeError:  # Unhashable arguments are passed straight through.
+                return method(self, *args, **kwargs)
+            if result is _MISSING:
+                result = method(self, *args, **kwargs)
+                if result:
+                    cache.set(key, result)
+            return _copy_cached(result)
+        return wrapper
+    return decorator
+
+# Short-lived lookups behind the interactive dropdowns and repeated report runs.
+_lookup_cache = TTLCache(maxsize=1024, ttl=60)
+# Group and project structure, read by nearly every page and report of a session.
+_scope_cache = TTLCache(maxsize=1024, ttl=60)
+# Group and project objects behind the lookups above, so one flow fetches each only once.
+_object_cache = TTLCache(maxsize=1024, ttl=60)
+# Issue listings are kept separately so label updates can invalidate them.
+_issue_list_cache = TTLCache(maxsize=256, ttl=60)
+
+# The REST issue filter's special milestone values, matched case-insensitively as GitLab does.
+_MILESTONE_WILDCARDS = {'none': 'NONE', 'any': 'ANY', 'upcoming': 'UPCOMING', 'started': 'STARTED'}
+
+# ETags with the parsed pages they validate, so unchanged listings come back as empty 304s.
+_etag_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Authenticated services per connection; reusing one keeps its HTTP keep-alive pool warm.
+_service_cache = TTLCache(maxsize=128, ttl=900)
+
+def get_gitlab_service(gitlab_url, private_token):
+    """Returns a cached, authenticated GitLabService for the given credentials."""
+    key = _connection_key(gitlab_url, private_token)
+    service = _service_cache.get(key)
+    if service is None:
+        service = GitLabService(gitlab_url, private_token)
+        _service_cache.set(key, service)
+    return service
+
+# Project names keyed by (connection, project ID), shared by every report and request.
+_project_name_cache = TTLCache(maxsize=4096, ttl=3600)
+
+def _scoped_queries(template):
+    """Renders a GraphQL query once per scope type, with its whitespace collapsed."""
+    return {scope: ' '.join((template % scope).split()) for scope in ('group', 'project')}
+
+_LEAD_CYCLE_TIME_QUERIES = _scoped_queries("""
+    query GetLeadCycleTimeMetrics($fullPath: ID!, $startDate: Date!, $endDate: Date!) {
+      %s(fullPath: $fullPath) {
+        valueStreams(first: 1) {
+          nodes {
+            stages {
+              nodes {
+                name
+                metrics(from: $startDate, to: $endDate) {
+                  median {
+                    value
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+""")
+
+_MILESTONE_STATS_QUERIES = _scoped_queries("""
+    query GetMilestoneStats($fullPath: ID!, $startDate: Date!, $endDate: Date!, $after: String) {
+      %s(fullPath: $fullPath) {
+        milestones(timeframe: {start: $startDate, end: $endDate}, after: $after) {
+          nodes {
+            id
+            title
+            dueDate
+            stats {
+              totalIssuesCount
+              closedIssuesCount
+            }
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+""")
+
 class GitLabService:
     """
     Service class to handle all interactions with the GitLab API.
@@ -23,20 +239,84 @@ class GitLabService:
         self.gl = None
         try:
             self.gl = gitlab.Gitlab(self.gitlab_url, private_token=self.private_token, ssl_verify=False, timeout=20) 
+            # Size the pool for concurrent fan-outs and retry transient failures of idempotent calls.
+            # Blocking makes extra threads, such as concurrent report jobs, wait for a free
+            # connection instead of opening throwaway ones past the GitLab rate limits.
+            # 429s are left to python-gitlab, which waits out Retry-After, and the last response is
+            # returned rather than raised so failures still surface as GitlabHttpError.
+            adapter = HTTPAdapter(
+                pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, pool_block=True,
+                max_retries=Retry(
+                    total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False
+                )
+            )
+            self.gl.session.mount('https://', adapter)
+            self.gl.session.mount('http://', adapter)
+            # Advertise every encoding urllib3 can decode here: gzip and deflate, plus br/zstd when installed.
+            self.gl.session.headers['Accept-Encoding'] = urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
             self.gl.auth()
             current_app.logger.info(f"Successfully connected to GitLab at {self.gitlab_url}")
         except (gitlab.exceptions.GitlabAuthenticationError, requests.exceptions.RequestException) as e:
             current_app.logger.error(f"GitLab connection failed: {e}")
             raise ConnectionError(f"Failed to connect or authenticate with GitLab. Details: {e}") from e
 
+    @property
+    def cache_key(self):
+        """Identifies this connection in shared caches without exposing the raw token."""
+        return _connection_key(self.gitlab_url, self.private_token)
+
+    def _get_cached_object(self, manager, kind, object_id):
+        """Fetches a group or project through the shared object cache."""
+        key = (self.cache_key, kind, str(object_id))
+        obj = _object_cache.get(key)
+        if obj is None:
+            obj = manager.get(object_id)
+            _object_cache.set(key, obj)
+        return _copy_rest_object(obj)
+
+    def _group(self, group_id):
+        """Returns the group with this ID, fetching it at most once per cache period."""
+        return self._get_cached_object(self.gl.groups, 'group', group_id)
+
+    def _project(self, project_id):
+        """Returns the project with this ID, fetching it at most once per cache period."""
+        return self._get_cached_object(self.gl.projects, 'project', project_id)
+
     def get_project(self, project_id):
         """Fetches a single project object by its ID."""
         try:
-            return self.gl.projects.get(project_id)
+            return self._project(project_id)
         except Exception as e:
             current_app.logger.error(f"Error fetching project {project_id}: {e}")
             return None
 
+    def get_project_names(self, project_ids, default="Unknown"):
+        """Resolves project IDs to their full names, fetching uncached IDs concurrently."""
+        names = {}
+        missing_ids = []
+        for pid in set(project_ids):
+            name = _project_name_cache.get((self.cache_key, pid), _MISSING)
+            if name is _MISSING:
+                missing_ids.append(pid)
+            else:
+                names[pid] = name
+
+        if missing_ids:
+            def fetch_name(pid):
+                try:
+                    return pid, self.gl.projects.get(pid).name_with_namespace, None
+                except (gitlab.exceptions.GitlabError, requests.exceptions.RequestException) as e:
+                    return pid, None, e
+
+            for pid, name, error in run_concurrently(fetch_name, missing_ids):
+                if error:
+                    # Failures are cached too, so a missing project is not re-requested.
+                    current_app.logger.error(f"Error fetching project {pid}: {error}")
+                names[pid] = name
+                _project_name_cache.set((self.cache_key, pid), name)
+        return {pid: names[pid] or default for pid in project_ids}
+
     def get_single_issue(self, project_id, issue_iid):
         """Fetches a single, complete issue object."""
         try:
@@ -51,7 +331,7 @@ class GitLabService:
         try:
             project = self.gl.projects.get(project_id, lazy=True)
             issue = project.issues.get(issue_iid, lazy=True)
-            return issue.resourcelabelevents.list(all=True)
+            return issue.resourcelabelevents.list(get_all=True)
         except Exception as e:
             current_app.logger.error(f"Error fetching label events for issue {project_id}/{issue_iid}: {e}")
             return []
@@ -61,7 +341,7 @@ class GitLabService:
         try:
             project = self.gl.projects.get(project_id, lazy=True)
             issue = project.issues.get(issue_iid, lazy=True)
-            return issue.resourcemilestoneevents.list(all=True)
+            return issue.resourcemilestoneevents.list(get_all=True)
         except Exception as e:
             current_app.logger.error(f"Error fetching milestone events for issue {project_id}/{issue_iid}: {e}")
             return []
@@ -74,17 +354,26 @@ class GitLabService:
             'Content-Type': 'application/json'
         }
         
-        payload = {'query': query, 'variables': variables}
+        payload = {'query': query, 'variables': variables or {}}
 
         try:
             current_app.logger.info(f"Attempting GraphQL POST to: {graphql_url}")
-            current_app.logger.info(f"GraphQL Payload: {json.dumps(payload)}")
+            body = _json_dumps(payload)
+            # Lazy %-formatting: full payloads and responses are only stringified when DEBUG is on.
+            current_app.logger.debug("GraphQL Payload: %s", payload)
             
-            response = requests.post(graphql_url, headers=headers, json=payload, verify=False)
+            # Share python-gitlab's pooled session so GraphQL calls reuse its kept-alive connections.
+            # Its rate-limit handling does not cover these raw posts, so 429s wait out Retry-After here.
+            for attempt in range(GRAPHQL_RATE_LIMIT_RETRIES + 1):
+                response = self.gl.session.post(graphql_url, headers=headers, data=body, verify=False, timeout=20)
+                if response.status_code != 429 or attempt == GRAPHQL_RATE_LIMIT_RETRIES:
+                    break
+                retry_after = response.headers.get('Retry-After', '')
+                time.sleep(int(retry_after) if retry_after.isdigit() else 2 ** attempt)
             response.raise_for_status()
             
-            response_data = response.json()
-            current_app.logger.info(f"GraphQL Response: {json.dumps(response_data)}")
+            response_data = _json_loads(response.content)
+            current_app.logger.debug("GraphQL Response: %s", response_data)
             
             return response_data
 
@@ -97,63 +386,19 @@ class GitLabService:
             raise e
 
     def get_lead_cycle_time_metrics(self, scope_full_path, scope_type, start_date, end_date):
-        """Fetches Lead and Cycle time by first finding the value stream and then querying its stages."""
-        
-        value_stream_query = f"""
-            query GetValueStreams($fullPath: ID!) {{
-              {scope_type}(fullPath: $fullPath) {{
-                valueStreams {{
-                  nodes {{
-                    id
-                    name
-                  }}
-                }}
-              }}
-            }}
-        """
-        vs_vars = {"fullPath": scope_full_path}
-        vs_result = self.execute_graphql(value_stream_query, vs_vars)
-        
-        value_streams = vs_result.get('data', {}).get(scope_type, {}).get('valueStreams', {}).get('nodes', [])
-        if not value_streams:
-            raise Exception("No value streams found for this scope.")
-            
-        value_stream_id = value_streams[0]['id']
-        current_app.logger.info(f"Found value stream '{value_streams[0]['name']}' with ID: {value_stream_id}")
+        """Fetches Lead and Cycle time from the scope's first value stream and its stage metrics in one query."""
+        metrics_query = _LEAD_CYCLE_TIME_QUERIES[scope_type]
 
-        metrics_query = """
-            query GetAllStageMetrics($fullPath: ID!, $vsId: [AnalyticsCycleAnalyticsValueStreamID!], $startDate: Date!, $endDate: Date!) {
-              %s(fullPath: $fullPath) {
-                valueStream(ids: $vsId) {
-                  nodes {
-                    stages {
-                      nodes {
-                        id
-                        name
-                        metrics(from: $startDate, to: $endDate) {
-                          median {
-                            value
-                          }
-                        }
-                      }
-                    }
-                  }
-                }
-              }
-            }
-        """ % scope_type
-        
         metric_vars = {
             "fullPath": scope_full_path,
-            "vsId": [value_stream_id],
             "startDate": start_date,
             "endDate": end_date
         }
-        
+
         metrics_result = self.execute_graphql(metrics_query, metric_vars)
-        vs_nodes = metrics_result.get('data', {}).get(scope_type, {}).get('valueStream', {}).get('nodes', [])
+        vs_nodes = metrics_result.get('data', {}).get(scope_type, {}).get('valueStreams', {}).get('nodes', [])
         if not vs_nodes:
-            raise Exception("Could not retrieve metrics for the value stream.")
+            raise Exception("No value streams found for this scope.")
 
         stages = vs_nodes[0].get('stages', {}).get('nodes', [])
 
@@ -171,18 +416,158 @@ class GitLabService:
             "cycle_time": cycle_time_seconds
         }
 
+    def get_milestone_stats(self, scope_full_path, scope_type, start_date, end_date):
+        """Fetches milestones overlapping a timeframe together with their issue counts via GraphQL."""
+        milestones_query = _MILESTONE_STATS_QUERIES[scope_type]
+
+        variables = {"fullPath": scope_full_path, "startDate": start_date, "endDate": end_date, "after": None}
+        milestones = []
+        while True:
+            result = self.execute_graphql(milestones_query, variables)
+            if result.get('errors'):
+                raise Exception(f"Milestone query failed: {result['errors']}")
+            connection = (result.get('data') or {}).get(scope_type, {}).get('milestones', {})
+            milestones.extend(connection.get('nodes', []))
+            page_info = connection.get('pageInfo', {})
+            if not page_info.get('hasNextPage'):
+                return milestones
+            variables['after'] = page_info['endCursor']
+
+    def get_escape_issue_counts(self, scope_full_path, scope_type, qa_labels, prod_labels, created_after, created_before):
+        """
+        Counts issues created in a period, plus those carrying any QA or any production
+        label, in one GraphQL request using aliased connections with OR label filters.
+        """
+        filters = "createdAfter: $createdAfter, createdBefore: $createdBefore"
+        if scope_type == 'group':
+            filters += ", includeSubgroups: true"
+        count_query = """
+            query CountEscapeIssues($fullPath: ID!, $qaLabels: [String!], $prodLabels: [String!], $createdAfter: Time, $createdBefore: Time) {
+              %(scope)s(fullPath: $fullPath) {
+                total: issues(%(filters)s) { count }
+                qa: issues(or: {labelNames: $qaLabels}, %(filters)s) { count }
+                prod: issues(or: {labelNames: $prodLabels}, %(filters)s) { count }
+              }
+            }
+        """ % {'scope': scope_type, 'filters': filters}
+
+        variables = {
+            "fullPath": scope_full_path,
+            "qaLabels": qa_labels,
+            "prodLabels": prod_labels,
+            "createdAfter": created_after,
+            "createdBefore": created_before
+        }
+        try:
+            result = self.execute_graphql(count_query, variables)
+            if result.get('errors'):
+                current_app.logger.error(f"Escape issue count query failed: {result['errors']}")
+                return None
+            counts = result['data'][scope_type]
+            return {key: counts[key]['count'] for key in ('total', 'qa', 'prod')}
+        except Exception as e:
+            current_app.logger.error(f"Error counting escape issues: {e}")
+            return None
+
+    @cached_per_connection(_issue_list_cache)
+    def get_issue_list(self, scope_full_path, scope_type, search=None, assignee_usernames=(),
+                       author_username=None, milestone=None, labels=()):
+        """
+        Fetches just the fields the issue search table shows, 100 issues per cursor page
+        over GraphQL. Returns a list of dicts, or None if the query fails.
+        """
+        declarations = ["$fullPath: ID!", "$after: String"]
+        arguments = ["first: 100", "after: $after"]
+        variables = {"fullPath": scope_full_path, "after": None}
+        if scope_type == 'group':
+            arguments.append("includeSubgroups: true")
+        if search:
+            declarations.append("$search: String")
+            arguments.append("search: $search")
+            variables['search'] = search
+        if assignee_usernames:
+            declarations.append("$assignees: [String!]")
+            arguments.append("assigneeUsernames: $assignees")
+            variables['assignees'] = list(assignee_usernames)
+        if author_username:
+            declarations.append("$author: String")
+            arguments.append("authorUsername: $author")
+            variables['author'] = author_username
+        if milestone and milestone.lower() in _MILESTONE_WILDCARDS:
+            # REST's special milestone values are wildcards in GraphQL, not titles.
+            declarations.append("$milestoneWildcard: MilestoneWildcardId")
+            arguments.append("milestoneWildcardId: $milestoneWildcard")
+            variables['milestoneWildcard'] = _MILESTONE_WILDCARDS[milestone.lower()]
+        elif milestone:
+            declarations.append("$milestone: [String]")
+            arguments.append("milestoneTitle: $milestone")
+            variables['milestone'] = [milestone]
+        if labels:
+            declarations.append("$labels: [String]")
+            arguments.append("labelName: $labels")
+            variables['labels'] = list(labels)
+
+        issues_query = """
+            query GetIssueList(%(declarations)s) {
+              %(scope)s(fullPath: $fullPath) {
+                issues(%(arguments)s) {
+                  nodes {
+                    iid
+                    title
+                    webUrl
+                    timeEstimate
+                    author { name }
+                    assignees(first: 1) { nodes { name } }
+                    labels { nodes { title } }
+                  }
+                  pageInfo {
+                    hasNextPage
+                    endCursor
+                  }
+                }
+              }
+            }
+        """ % {'declarations': ', '.join(declarations), 'scope': scope_type, 'arguments': ', '.join(arguments)}
+
+        issues = []
+        try:
+            while True:
+                result = self.execute_graphql(issues_query, variables)
+                if result.get('errors'):
+                    current_app.logger.error(f"Issue list query failed: {result['errors']}")
+                    return None
+                connection = result['data'][scope_type]['issues']
+                for node in connection['nodes']:
+                    assignees = node['assignees']['nodes']
+                    issues.append({
+                        'iid': int(node['iid']), 'title': node['title'], 'web_url': node['webUrl'],
+                        'assignee': assignees[0]['name'] if assignees else None,
+                        'author': (node['author'] or {}).get('name'),
+                        'labels': [label['title'] for label in node['labels']['nodes']],
+                        'time_estimate': node['timeEstimate'] or 0
+                    })
+                page_info = connection['pageInfo']
+                if not page_info['hasNextPage']:
+                    return issues
+                variables['after'] = page_info['endCursor']
+        except Exception as e:
+            current_app.logger.error(f"Error fetching issue list: {e}")
+            return None
+
+    @cached_per_connection(_scope_cache)
     def get_scope_object(self, scope_id, scope_type):
         """Gets a group or project object by its ID and ensures it has a 'full_path' attribute."""
         try:
             if scope_type == 'group':
-                return self.gl.groups.get(scope_id)
+                return self._group(scope_id)
             else:
-                project = self.gl.projects.get(scope_id)
+                project = self._project(scope_id)
                 project.full_path = project.path_with_namespace
                 return project
         except gitlab.exceptions.GitlabGetError:
             return None
 
+    @cached_per_connection(_lookup_cache)
     def search_users(self, search_term):
         """Searches for users by name or username."""
         try:
@@ -191,28 +576,88 @@ class GitLabService:
             current_app.logger.error(f"Error searching for users: {e}")
             return []
 
-    def get_user_merge_requests(self, username, **kwargs):
-        """Fetches merge requests for a specific user."""
+    def get_user_merge_request_counts(self, username, states, updated_after=None):
+        """
+        Counts a user's authored merge requests in each of the given states with one
+        GraphQL request, one aliased count per state. Returns a Counter, or None on error.
+        """
+        filters = ", updatedAfter: $updatedAfter" if updated_after else ""
+        selections = "\n".join(
+            f"{state}: authoredMergeRequests(state: {state}{filters}) {{ count }}" for state in states
+        )
+        count_query = """
+            query CountUserMergeRequests($username: String!%s) {
+              user(username: $username) {
+                %s
+              }
+            }
+        """ % (", $updatedAfter: Time" if updated_after else "", selections)
+
+        variables = {"username": username}
+        if updated_after:
+            variables["updatedAfter"] = updated_after
         try:
-            return self.gl.mergerequests.list(author_username=username, all=True, **kwargs)
+            result = self.execute_graphql(count_query, variables)
+            if result.get('errors') or not (result.get('data') or {}).get('user'):
+                current_app.logger.error(f"Merge request count query failed for user {username}: {result.get('errors')}")
+                return None
+            counts = result['data']['user']
+            return Counter({state: counts[state]['count'] for state in states})
+        except Exception as e:
+            current_app.logger.error(f"Error counting merge requests for user {username}: {e}")
+            return None
+
+    def count_user_merge_requests_by_state(self, username, **kwargs):
+        """Counts a user's merge requests per state, streaming pages instead of holding every MR."""
+        try:
+            mrs = self.gl.mergerequests.list(author_username=username, iterator=True, per_page=100, **kwargs)
+            return Counter(mr.state for mr in mrs)
         except Exception as e:
             current_app.logger.error(f"Error fetching merge requests for user {username}: {e}")
-            return []
+            return Counter()
 
+    def _list_conditionally(self, manager, **params):
+        """
+        Lists every page of a manager's collection, re-requesting each page with its
+        last ETag in If-None-Match. Pages GitLab reports unchanged (304) are served
+        from the cache instead of being transferred and parsed again.
+        """
+        attrs_list = []
+        page = 1
+        while page:
+            query = {**params, 'per_page': 100, 'page': page}
+            key = (self.cache_key, manager.path, frozenset(query.items()))
+            cached = _etag_cache.get(key)
+            headers = {'If-None-Match': cached[0]} if cached else None
+            try:
+                response = self.gl.http_request('get', manager.path, query_data=query, extra_headers=headers)
+                page_attrs, next_page = response.json(), response.headers.get('X-Next-Page')
+                if response.headers.get('ETag'):
+                    _etag_cache.set(key, (response.headers['ETag'], page_attrs, next_page))
+            except gitlab.exceptions.GitlabHttpError as e:
+                if e.response_code != 304 or cached is None:
+                    raise
+                _, page_attrs, next_page = cached
+            attrs_list.extend(page_attrs)
+            page = int(next_page) if next_page else None
+        return [manager._obj_cls(manager, attrs, created_from_list=True) for attrs in attrs_list]
+
+    @cached_per_connection(_scope_cache)
     def get_user_groups(self):
         """Fetches only the top-level groups the user is a member of."""
         try:
-            return self.gl.groups.list(all=True, as_list=True, top_level_only=True)
+            return self._list_conditionally(self.gl.groups, top_level_only='true')
         except Exception as e:
             current_app.logger.error(f"Failed to fetch user groups: {e}")
             return None
 
+    @cached_per_connection(_scope_cache)
     def get_group_details(self, group_id):
         """Fetches details for a single group, including subgroups and projects."""
         try:
-            group = self.gl.groups.get(group_id)
-            subgroups = group.subgroups.list(all=True)
-            projects = group.projects.list(all=True, include_subgroups=False)
+            group = self._group(group_id)
+            subgroups = self._list_conditionally(group.subgroups)
+            projects = self._list_conditionally(group.projects, include_subgroups='false')
             return {'group': group, 'subgroups': subgroups, 'projects': projects}
         except gitlab.exceptions.GitlabGetError as e:
             current_app.logger.error(f"Could not find group with ID {group_id}: {e}")
@@ -221,104 +666,146 @@ class GitLabService:
             current_app.logger.error(f"Error fetching details for group {group_id}: {e}")
             return None
 
+    @cached_per_connection(_lookup_cache)
     def get_group_epics(self, group_id, search_term):
         """Searches for epics within a group."""
         try:
-            group = self.gl.groups.get(group_id)
+            group = self._group(group_id)
             return group.epics.list(search=search_term)
         except Exception as e:
             current_app.logger.error(f"Error searching epics in group {group_id}: {e}")
             return []
 
-    def _get_descendant_epic_issues(self, group, epic_iid, issues_list):
-        """Recursively fetches issues from an epic and its descendants."""
+    def _get_epic_node(self, group_id, epic_iid):
+        """Fetches one epic's issues and its child epics as (group ID, epic IID) pairs."""
         try:
-            epic = group.epics.get(epic_iid)
-            issues_list.extend(epic.issues.list(all=True, as_list=True))
-            descendants = epic.epics.list(all=True, as_list=True)
-            for descendant in descendants:
-                self._get_descendant_epic_issues(group, descendant.iid, issues_list)
+            epic = self.gl.groups.get(group_id, lazy=True).epics.get(epic_iid, lazy=True)
+            issues = epic.issues.list(get_all=True)
+            # python-gitlab has no manager for epic links, so list the child epics directly.
+            children = self.gl.http_list(f"/groups/{group_id}/epics/{epic_iid}/epics", get_all=True)
+            return issues, [(child['group_id'], child['iid']) for child in children]
         except Exception as e:
-            current_app.logger.error(f"Could not process epic iid {epic_iid} in group {group.id}: {e}")
+            current_app.logger.error(f"Could not process epic iid {epic_iid} in group {group_id}: {e}")
+            return [], []
 
     def get_epic_issues(self, group_id, epic_iid):
-        """Fetches all issues for a given epic and its descendant epics."""
+        """
+        Fetches all issues for a given epic and its descendant epics, walking the tree
+        one level at a time with each level's epics fetched concurrently.
+        """
         try:
-            group = self.gl.groups.get(group_id)
-            all_issues = []
-            self._get_descendant_epic_issues(group, epic_iid, all_issues)
-            unique_issues = list({issue.id: issue for issue in all_issues}.values())
-            current_app.logger.info(f"Found {len(unique_issues)} unique issues for epic #{epic_iid} and its descendants.")
+            group = self._group(group_id)
+            issues_by_id = {}
+            frontier = [(group.id, int(epic_iid))]
+            visited = set(frontier)
+            while frontier:
+                next_frontier = []
+                for issues, children in run_concurrently(lambda node: self._get_epic_node(*node), frontier, max_workers=8):
+                    # Issues shared between epics are kept once as they arrive.
+                    for issue in issues:
+                        issues_by_id.setdefault(issue.id, issue)
+                    for child in children:
+                        if child not in visited:
+                            visited.add(child)
+                            next_frontier.append(child)
+                frontier = next_frontier
+            unique_issues = list(issues_by_id.values())
+            current_app.logger.debug("Found %d unique issues for epic #%s and its descendants.", len(unique_issues), epic_iid)
             return unique_issues
         except Exception as e:
             current_app.logger.error(f"Error fetching issues for epic {epic_iid}: {e}")
             return []
 
+    def _get_issue_manager(self, scope_id, scope_type, params):
+        """Returns the issue manager for a group, project or the whole instance."""
+        if scope_id and scope_type:
+            if scope_type == 'group':
+                params['include_subgroups'] = True
+                return self._group(scope_id).issues
+            return self._project(scope_id).issues
+        return self.gl.issues
+
     def get_issues(self, scope_id=None, scope_type=None, **kwargs):
         """
         Fetches issues with filters. Returns a paginated object by default.
         Can be scoped to a group/project or be instance-wide.
         """
         try:
-            if scope_id and scope_type:
-                if scope_type == 'group':
-                    item = self.gl.groups.get(scope_id)
-                    kwargs['include_subgroups'] = True
-                else: # project
-                    item = self.gl.projects.get(scope_id)
-                issues = item.issues.list(**kwargs)
-            else: # Instance-wide search
-                issues = self.gl.issues.list(**kwargs)
-            
-            current_app.logger.info(f"Fetched paginated issues with filters: {kwargs}")
+            issues = self._get_issue_manager(scope_id, scope_type, kwargs).list(**kwargs)
+            current_app.logger.debug("Fetched paginated issues with filters: %s", kwargs)
             return issues
         except Exception as e:
             current_app.logger.error(f"Error fetching paginated issues: {e}")
             return []
     
+    def _list_all_pages(self, manager, per_page=100, **kwargs):
+        """
+        Lists every item of a paginated collection. The first page reports the page
+        count, so the remaining pages are then requested concurrently.
+        """
+        first_page = manager.list(iterator=True, per_page=per_page, **kwargs)
+        items = list(itertools.islice(first_page, per_page))
+        total_pages = first_page.total_pages
+        if not total_pages:
+            # GitLab omits pagination totals on very large collections; follow the next links instead.
+            items.extend(first_page)
+            return items
+
+        remaining_pages = run_concurrently(
+            lambda page: manager.list(page=page, per_page=per_page, get_all=False, **kwargs),
+            range(2, total_pages + 1)
+        )
+        for page_items in remaining_pages:
+            items.extend(page_items)
+        return items
+
+    @cached_per_connection(_issue_list_cache)
     def get_all_issues(self, scope_id=None, scope_type=None, **kwargs):
         """
         Fetches ALL issues as a list, without pagination.
         Can be scoped to a group/project or be instance-wide.
         """
         try:
-            kwargs['all'] = True
-            if scope_id and scope_type:
-                if scope_type == 'group':
-                    item = self.gl.groups.get(scope_id)
-                    kwargs['include_subgroups'] = True
-                else:
-                    item = self.gl.projects.get(scope_id)
-                issues = item.issues.list(**kwargs)
-            else: # Instance-wide search
-                issues = self.gl.issues.list(**kwargs)
-            
-            if 'as_list' not in kwargs or kwargs['as_list']:
-                 issues = list(issues)
-
-            current_app.logger.info(f"Fetched ALL {len(issues)} issues with filters: {kwargs}")
+            issues = self._list_all_pages(self._get_issue_manager(scope_id, scope_type, kwargs), **kwargs)
+            current_app.logger.debug("Fetched ALL %d issues with filters: %s", len(issues), kwargs)
             return issues
         except Exception as e:
             current_app.logger.error(f"Error fetching all issues: {e}")
             return []
+
+    def iter_issue_pages(self, scope_id=None, scope_type=None, per_page=100, **kwargs):
+        """
+        Yields matching issues one API page at a time, so callers can reduce each
+        page before the next is fetched instead of holding every issue at once.
+        """
+        try:
+            issues = self._get_issue_manager(scope_id, scope_type, kwargs).list(iterator=True, per_page=per_page, **kwargs)
+            while True:
+                page = list(itertools.islice(issues, per_page))
+                if not page:
+                    return
+                yield page
+        except Exception as e:
+            current_app.logger.error(f"Error streaming issues: {e}")
             
     def get_scope_members(self, scope_id, scope_type='group'):
         """Fetches all members of a group or project."""
         try:
             if scope_type == 'group':
-                item = self.gl.groups.get(scope_id)
+                item = self._group(scope_id)
             else:
-                item = self.gl.projects.get(scope_id)
-            return item.members.list(all=True)
+                item = self._project(scope_id)
+            return item.members.list(get_all=True)
         except Exception as e:
             current_app.logger.error(f"Error fetching members for {scope_type} ID {scope_id}: {e}")
             return []
     
+    @cached_per_connection(_lookup_cache)
     def get_milestones(self, scope_id, scope_type, **kwargs):
         """Fetches milestones for a given group or project."""
         try:
             scope = self.get_scope_object(scope_id, scope_type)
-            return scope.milestones.list(all=True, as_list=True, **kwargs)
+            return scope.milestones.list(get_all=True, **kwargs)
         except Exception as e:
             current_app.logger.error(f"Error fetching milestones for {scope_type} {scope_id}: {e}")
             return []
@@ -326,19 +813,49 @@ class GitLabService:
     def get_single_milestone(self, group_id, milestone_id):
         """Fetches a single milestone by its ID."""
         try:
-            group = self.gl.groups.get(group_id)
+            group = self._group(group_id)
             return group.milestones.get(milestone_id)
         except Exception as e:
             current_app.logger.error(f"Error fetching single milestone {milestone_id} from group {group_id}: {e}")
             return None
     
+    def _forget_issue_lists(self, project_id):
+        """
+        Drops this connection's cached issue lists that may contain the project's issues:
+        its own, every group list and the instance-wide ones. Other projects' lists stay.
+        """
+        project = _object_cache.get((self.cache_key, 'project', str(project_id)))
+        project_scopes = {str(project_id)}
+        if project is not None:
+            project_scopes.add(project.path_with_namespace)
+
+        def affected(key):
+            connection, method_name, args, kwargs = key
+            if connection != self.cache_key:
+                return False
+            kwargs = dict(kwargs)
+            scope = args[0] if args else kwargs.get('scope_id', kwargs.get('scope_full_path'))
+            scope_type = args[1] if len(args) > 1 else kwargs.get('scope_type')
+            if scope_type != 'project':
+                return True
+            # get_issue_list is keyed by path, which is only known if the project was fetched.
+            if method_name == 'get_issue_list' and project is None:
+                return True
+            return str(scope) in project_scopes
+
+        _issue_list_cache.discard(affected)
+
     def update_issue_labels(self, project_id, issue_iid, labels_to_add):
-        """Updates the labels for a specific issue."""
+        """Adds labels to a specific issue, keeping the ones it already has."""
+        # add_labels is idempotent on the server, so duplicates are dropped but the PUT always goes out.
+        additions = list(dict.fromkeys(labels_to_add))
+        if not additions:
+            return True, None
         try:
+            # add_labels lets GitLab merge with the existing labels in a single PUT.
             project = self.gl.projects.get(project_id, lazy=True)
-            issue = project.issues.get(issue_iid, lazy=True)
-            issue.labels = list(set(issue.labels + labels_to_add))
-            issue.save()
+            project.issues.update(issue_iid, {'add_labels': ','.join(additions)})
+            self._forget_issue_lists(project_id)
             current_app.logger.info(f"Successfully updated labels for issue {project_id}/{issue_iid}")
             return True, None
         except gitlab.exceptions.GitlabError as e:
@@ -348,8 +865,9 @@ class GitLabService:
     def create_issue(self, project_id, title, description):
         """Creates a new issue in a project."""
         try:
-            project = self.gl.projects.get(project_id)
+            project = self._project(project_id)
             issue = project.issues.create({'title': title, 'description': description})
+            self._forget_issue_lists(project_id)
             current_app.logger.info(f"Created issue #{issue.iid} in project {project_id}")
             return issue, None
         except gitlab.exceptions.GitlabError as e:
@@ -0,0 +1,31 @@
+# /app/main/session_store.py
+# Keeps bulky per-user data on the server so the signed session cookie stays small.
+# Entries live in a FileStore, so whichever worker process answers a request sees them.
+
+import secrets
+
+from flask import session
+
+from app.main.file_store import FileStore
+
+# Entries are dropped a working day after they were last written; the cookie only carries the key.
+_store = FileStore('sessions', ttl=12 * 3600)
+
+def get_session_value(key, default=None):
+    """Returns the server-side value stored under key for the current session."""
+    sid = session.get('sid')
+    return _store.get((sid, key), default) if sid else default
+
+def set_session_value(key, value):
+    """Stores value under key for the current session, creating its ID on first use."""
+    sid = session.get('sid')
+    if sid is None:
+        sid = secrets.token_urlsafe(24)
+        session['sid'] = sid
+    _store.set((sid, key), value)
+
+def clear_session_data():
+    """Deletes the current session's server-side data and forgets its ID."""
+    sid = session.pop('sid', None)
+    if sid:
+        _store.delete_group(sid)
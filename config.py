@@ -7,20 +7,27 @@ class Config:
     """Application configuration settings."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'a-very-secret-and-secure-key-for-dev')
     CHATGPT_API_KEY = os.environ.get('CHATGPT_API_KEY') 
+    # Log template paths and registered blueprints at startup
+    VERBOSE_STARTUP = os.environ.get('VERBOSE_STARTUP', '').lower() in ('1', 'true', 'yes')
+    # State every worker process must see, such as report jobs, is kept under this directory.
+    # It must be private to the app's user; unset, the instance folder's shared_state is used.
+    SHARED_STATE_DIR = os.environ.get('SHARED_STATE_DIR')
 
     # Add these two lines for your internal LiteLLM gateway
     LITELLM_GATEWAY_URL = ""
     LITELLM_GATEWAY_KEY = ""
     
     # Predefined Labels
-    WORKFLOW_LABELS = [
+    WORKFLOW_LABELS = (
         "workflow::grooming", "workflow::scoping", "workflow::clarification",
         "workflow::qa-scoping", "workflow::triage", "workflow::review",
         "workflow::qa", "workflow::resolved", "workflow::hold", "workflow::blocked"
-    ]
-    TYPE_LABELS = [
+    )
+    TYPE_LABELS = (
         "type::new-feature", "type::customisation", "type::enhancement", "type::bug",
         "type::categorisation", "type::refactoring", "type::dc-movement",
         "type::move-to-prod", "type::operations", "type::poc", "type::other"
-    ]
-    PRIORITY_LABELS = ["priority::1", "priority::2", "priority::3"]
\ No newline at end of file
+    )
+    PRIORITY_LABELS = ("priority::1", "priority::2", "priority::3")
+    # Every label the suggestion forms can submit, for constant-time validation
+    SUGGESTION_LABELS = frozenset(WORKFLOW_LABELS + TYPE_LABELS + PRIORITY_LABELS)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # /run.py
-# Main entry point for the application.
+# Development entry point for the application.
 # To run: python run.py
+# For production, serve wsgi.py with gunicorn instead of the single-process dev server.
 
 from app import create_app
 
@@ -0,0 +1,17 @@
+# /wsgi.py
+# Production entry point for WSGI servers.
+# To run: gunicorn -k gevent -w 4 --worker-connections 200 wsgi:application
+# Report jobs and session data are kept under SHARED_STATE_DIR, so every worker must see the same
+# directory: keep the workers on one host, or point it at a shared mount. Otherwise run with -w 1;
+# gevent still serves requests concurrently within that single worker.
+
+try:
+    # Patch before anything imports requests/urllib3, so GitLab calls yield instead of blocking the worker.
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from app import create_app
+
+application = create_app()